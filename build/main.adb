@@ -0,0 +1,27 @@
+with Ada.Text_IO;
+with RFLX.RFLX_Builtin_Types;
+with RFLX.TLV.Message;
+
+procedure Main is
+   Buffer  : RFLX.RFLX_Builtin_Types.Bytes_Ptr := new RFLX.RFLX_Builtin_Types.Bytes'(64, 4, 0, 0, 0, 0);
+   Context : RFLX.TLV.Message.Context;
+begin
+   RFLX.TLV.Message.Initialize (Context, Buffer);
+   RFLX.TLV.Message.Verify_Message (Context);
+   if RFLX.TLV.Message.Structural_Valid_Message (Context) then
+      case RFLX.TLV.Message.Get_Tag (Context) is
+         when RFLX.TLV.Msg_Data =>
+            if RFLX.TLV.Message.Present (Context, RFLX.TLV.Message.F_Value) then
+               Ada.Text_IO.Put_Line ("Data message with value of"
+                                     & RFLX.TLV.Message.Get_Length (Context)'Img
+                                     & " byte length");
+            else
+               Ada.Text_IO.Put_Line ("Data message without value");
+            end if;
+         when RFLX.TLV.Msg_Error =>
+            Ada.Text_IO.Put_Line ("Error message");
+      end case;
+   else
+      Ada.Text_IO.Put_Line ("Invalid message");
+   end if;
+end Main;
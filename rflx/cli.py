@@ -6,10 +6,17 @@ from typing import List, Union
 
 from rflx import __version__
 from rflx.common import flat_name
+from rflx.expression import (
+    disable_simplification_cache,
+    enable_simplification_cache,
+    set_proof_cache,
+    set_proof_workers,
+    shutdown_proof_executors,
+)
 from rflx.generator import Generator, InternalError
 from rflx.graph import Graph
 from rflx.model import Model, ModelError
-from rflx.parser import Parser, ParserError
+from rflx.parser import Parser, ParserError, set_parser_cache, set_parser_workers
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 
@@ -26,6 +33,25 @@ def main(argv: List[str]) -> Union[int, str]:
         "-q", "--quiet", action="store_true", help="disable logging to standard output"
     )
     parser.add_argument("--version", action="store_true")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of processes used for parsing and proving (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--proof-cache",
+        metavar="DIRECTORY",
+        type=str,
+        help="cache proof results persistently in directory",
+    )
+    parser.add_argument(
+        "--parser-cache",
+        metavar="DIRECTORY",
+        type=str,
+        help="cache parsed specification files persistently in directory",
+    )
 
     subparsers = parser.add_subparsers(dest="subcommand")
 
@@ -49,6 +75,11 @@ def main(argv: List[str]) -> Union[int, str]:
     parser_generate.add_argument(
         "-d", "--directory", help="output directory", default=".", type=str
     )
+    parser_generate.add_argument(
+        "--simplification-cache",
+        help="cache simplified expressions during checking and code generation",
+        action="store_true",
+    )
     parser_generate.add_argument(
         "files", metavar="FILE", type=str, nargs="*", help="specification file"
     )
@@ -82,6 +113,14 @@ def main(argv: List[str]) -> Union[int, str]:
     if args.quiet:
         logging.disable(logging.CRITICAL)
 
+    if args.workers < 1:
+        return f'{parser.prog}: error: invalid number of workers "{args.workers}"'
+
+    proof_workers = set_proof_workers(args.workers)
+    parser_workers = set_parser_workers(args.workers)
+    set_proof_cache(Path(args.proof_cache) if args.proof_cache else None)
+    set_parser_cache(Path(args.parser_cache) if args.parser_cache else None)
+
     try:
         args.func(args)
     except ParserError as e:
@@ -92,6 +131,10 @@ def main(argv: List[str]) -> Union[int, str]:
         return f"{parser.prog}: internal error: {e}"
     except (Error, OSError) as e:
         return f"{parser.prog}: error: {e}"
+    finally:
+        set_proof_workers(proof_workers)
+        set_parser_workers(parser_workers)
+        shutdown_proof_executors()
 
     return 0
 
@@ -113,8 +156,14 @@ def generate(args: argparse.Namespace) -> None:
 
     generator = Generator(args.prefix, reproducible=os.environ.get("RFLX_REPRODUCIBLE") is not None)
 
-    model = parse(args.files)
-    generator.generate(model)
+    if args.simplification_cache:
+        enable_simplification_cache()
+
+    try:
+        model = parse(args.files)
+        generator.generate(model)
+    finally:
+        disable_simplification_cache()
 
     generator.write_units(directory)
     if not args.no_library:
@@ -130,7 +179,7 @@ def parse(files: List) -> Model:
         if not Path(f).is_file():
             raise Error(f'file not found: "{f}"')
 
-        parser.parse(Path(f))
+    parser.parse_all([Path(f) for f in files])
 
     return parser.create_model()
 
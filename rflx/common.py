@@ -1,4 +1,4 @@
-from typing import Iterable, Iterator, Set, TypeVar
+from typing import Any, Dict, Iterable, Iterator, Set, Tuple, TypeVar
 
 
 def generic_repr(class_name: str, obj_dict: dict) -> str:
@@ -6,6 +6,27 @@ def generic_repr(class_name: str, obj_dict: dict) -> str:
     return indent_next(f"\n{class_name}({indent(args, 4)})", 4)
 
 
+SLOT_NAMES: Dict[type, Tuple[str, ...]] = {}
+
+
+def slot_names(cls: type) -> Tuple[str, ...]:
+    """Return the attribute names of all `__slots__` defined by a class and its base classes."""
+    if cls not in SLOT_NAMES:
+        names = []
+        for c in reversed(cls.__mro__):
+            for name in c.__dict__.get("__slots__", ()):
+                if name.startswith("__") and not name.endswith("__"):
+                    name = f"_{c.__name__.lstrip('_')}{name}"
+                names.append(name)
+        SLOT_NAMES[cls] = tuple(names)
+    return SLOT_NAMES[cls]
+
+
+def slot_values(obj: object) -> Dict[str, Any]:
+    """Return the initialized attributes of an object whose class defines `__slots__`."""
+    return {n: getattr(obj, n) for n in slot_names(type(obj)) if hasattr(obj, n)}
+
+
 def indent(string: str, indentation: int) -> str:
     return "\n".join((indentation * " " + l if l else "") for l in string.split("\n"))
 
@@ -1,10 +1,33 @@
 # pylint: disable=too-many-lines,too-many-ancestors
+import atexit
+import functools
+import hashlib
 import itertools
+import json
 import operator
+import os
+import tempfile
+import weakref
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from copy import copy
 from enum import Enum
-from typing import Callable, List, Mapping, Optional, Sequence, Tuple, Union
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import z3
 
@@ -34,43 +57,437 @@ class Proof:
     def __init__(self, expr: "Expr", facts: Optional[Sequence["Expr"]] = None):
         self.__expr = expr
         self.__facts = facts or []
-        self.__result = ProofResult.unsat
-
-        solver = z3.Solver()
-        solver.add(self.__expr.z3expr())
-        for f in self.__facts:
-            solver.add(f.z3expr())
-
-        self.__result = ProofResult(solver.check())
+        self.__result: Optional[ProofResult] = None
+        self.__key: Optional[str] = None
 
     @property
     def result(self) -> ProofResult:
+        if self.__result is None and PROOF_CACHE:
+            self.__result = PROOF_CACHE.result(self.key)
+
+        if self.__result is None:
+            self.__result = solve(self.__expr, self.__facts)
+
+            if PROOF_CACHE:
+                PROOF_CACHE.add_result(self.key, self.__result)
+
         return self.__result
 
+    @property
+    def expr(self) -> "Expr":
+        return self.__expr
+
+    @property
+    def facts(self) -> Sequence["Expr"]:
+        return self.__facts
+
+    @property
+    def key(self) -> str:
+        """Return a digest of the normalized goal and facts, which identifies the proof."""
+        if self.__key is None:
+            digest = hashlib.sha256(z3.get_version_string().encode())
+            for e in [self.__expr, *self.__facts]:
+                digest.update(b"\0" + e.z3expr().sexpr().encode())
+            self.__key = digest.hexdigest()
+        return self.__key
+
+    @staticmethod
+    def check_all(proofs: Sequence["Proof"], workers: int = None) -> None:
+        """
+        Determine the results of all given proofs.
+
+        The proofs are checked incrementally, so proofs with common facts should be adjacent and
+        their common facts should be placed at the beginning. The proofs are distributed to a pool
+        of worker processes, as z3 contexts must not be shared between threads.
+        """
+        workers = workers or PROOF_WORKERS
+        pending = [p for p in proofs if p.__result is None]
+
+        if PROOF_CACHE:
+            for p in pending:
+                p.__result = PROOF_CACHE.result(p.key)
+            pending = [p for p in pending if p.__result is None]
+
+        if workers < 2 or len(pending) < 2:
+            results = check_incrementally(pending)
+        else:
+            size = -(-len(pending) // (4 * workers))
+            chunks = [pending[i : i + size] for i in range(0, len(pending), size)]
+            results = [
+                r
+                for chunk_results in proof_executor(workers).map(check_incrementally, chunks)
+                for r in chunk_results
+            ]
+
+        for p, result in zip(pending, results):
+            p.__result = result
+            if PROOF_CACHE:
+                PROOF_CACHE.add_result(p.key, result)
+
+    @staticmethod
+    def check_until_sat(proofs: Iterable["Proof"], workers: int = None) -> List["Proof"]:
+        """
+        Determine the results of the given proofs until the first satisfiable proof is found.
+
+        The proofs are taken lazily from the iterable and checked in order. With a single worker,
+        all proofs are checked by one solver, which keeps the leading facts shared with the
+        preceding proof asserted. Otherwise, one proof per worker process is checked at a time.
+        All checked proofs are returned. If any proof is satisfiable, the last returned proof is
+        the first satisfiable one.
+        """
+        workers = workers or PROOF_WORKERS
+        remaining = iter(proofs)
+        result: List[Proof] = []
+
+        if workers < 2:
+            solver = IncrementalSolver()
+            for p in remaining:
+                if p.__result is None and PROOF_CACHE:
+                    p.__result = PROOF_CACHE.result(p.key)
+                if p.__result is None:
+                    p.__result = solver.check(p)
+                    if PROOF_CACHE:
+                        PROOF_CACHE.add_result(p.key, p.__result)
+                result.append(p)
+                if p.__result == ProofResult.sat:
+                    break
+            return result
+
+        while True:
+            chunk = list(itertools.islice(remaining, workers))
+            if not chunk:
+                return result
+            Proof.check_all(chunk, workers)
+            for p in chunk:
+                result.append(p)
+                if p.result == ProofResult.sat:
+                    return result
+
     @property
     def error(self) -> str:
-        assert self.__result == ProofResult.unsat
-        solver = z3.Solver()
-        solver.set(unsat_core=True)
+        assert self.result == ProofResult.unsat
         facts = {f"H{index}": fact for index, fact in enumerate(self.__facts)}
-        for name, fact in facts.items():
-            solver.assert_and_track(fact.z3expr(), name)
-
-        solver.assert_and_track(self.__expr.z3expr(), "goal")
         facts["goal"] = self.__expr
-        result = solver.check()
-        assert result == z3.unsat, f"result should be unsat (is {result})"
-        return "\n   ∧ ".join([str(facts[str(fact)]) for fact in solver.unsat_core()])
+
+        unsat_core = PROOF_CACHE.unsat_core(self.key) if PROOF_CACHE else None
+
+        if unsat_core is None:
+            solver = z3.Solver()
+            solver.set(unsat_core=True)
+            for name, fact in facts.items():
+                solver.assert_and_track(fact.z3expr(), name)
+
+            result = solver.check()
+            assert result == z3.unsat, f"result should be unsat (is {result})"
+            unsat_core = [str(fact) for fact in solver.unsat_core()]
+
+            if PROOF_CACHE:
+                PROOF_CACHE.add_unsat_core(self.key, unsat_core)
+
+        return "\n   ∧ ".join([str(facts[name]) for name in unsat_core])
+
+
+class ProofCache:
+    """
+    Persistent cache of proof results and unsat cores.
+
+    Each proof is stored in a separate file, which is named by the key of the proof. Files are
+    replaced atomically, so that a cache directory can be shared by multiple processes.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def result(self, key: str) -> Optional[ProofResult]:
+        entry = self.__load(key)
+        return ProofResult[entry["result"]] if "result" in entry else None
+
+    def unsat_core(self, key: str) -> Optional[List[str]]:
+        return self.__load(key).get("unsat_core")
+
+    def add_result(self, key: str, result: ProofResult) -> None:
+        self.__store(key, {**self.__load(key), "result": result.name})
+
+    def add_unsat_core(self, key: str, unsat_core: Sequence[str]) -> None:
+        self.__store(key, {**self.__load(key), "unsat_core": list(unsat_core)})
+
+    def __path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def __load(self, key: str) -> Dict[str, Any]:
+        try:
+            with open(self.__path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return entry if isinstance(entry, dict) else {}
+
+    def __store(self, key: str, entry: Dict[str, Any]) -> None:
+        path = self.__path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=path.parent, delete=False) as f:
+            json.dump(entry, f)
+        os.replace(f.name, path)
+
+
+PROOF_CACHE: Optional[ProofCache] = None
+
+
+def set_proof_cache(directory: Optional[Path]) -> None:
+    """Enable the persistent proof cache in the given directory, or disable it if None."""
+    global PROOF_CACHE  # pylint: disable=global-statement
+    PROOF_CACHE = ProofCache(directory) if directory else None
+
+
+PROOF_WORKERS = 1
+PROOF_EXECUTORS: Dict[int, ProcessPoolExecutor] = {}
+
+
+def set_proof_workers(workers: int) -> int:
+    """
+    Set the default number of processes used for checking multiple proofs at once.
+
+    The previous number is returned, so that it can be restored.
+    """
+    if workers < 1:
+        raise ValueError(f"invalid number of workers {workers}")
+    global PROOF_WORKERS  # pylint: disable=global-statement
+    previous = PROOF_WORKERS
+    PROOF_WORKERS = workers
+    return previous
+
+
+def proof_executor(workers: int) -> ProcessPoolExecutor:
+    if workers not in PROOF_EXECUTORS:
+        PROOF_EXECUTORS[workers] = ProcessPoolExecutor(workers)
+    return PROOF_EXECUTORS[workers]
+
+
+@atexit.register
+def shutdown_proof_executors() -> None:
+    """Terminate the worker processes of all proof executors."""
+    for executor in PROOF_EXECUTORS.values():
+        executor.shutdown()
+    PROOF_EXECUTORS.clear()
+
+
+def solve(expr: "Expr", facts: Sequence["Expr"]) -> ProofResult:
+    solver = z3.Solver()
+    solver.add(expr.z3expr())
+    for f in facts:
+        solver.add(f.z3expr())
+    return ProofResult(solver.check())
+
+
+class FactNode(NamedTuple):
+    children: Dict["Expr", "FactNode"]
+    proofs: List[int]
+
+
+def check_incrementally(proofs: Sequence[Proof]) -> List[ProofResult]:
+    """
+    Check proofs using a single solver.
+
+    The facts of all proofs are arranged in a prefix tree, which is traversed depth-first. Each
+    fact is asserted once for all proofs sharing the same preceding facts, and each goal is checked
+    in a separate solver scope. If the incremental solver cannot decide a proof, the proof is
+    checked again by a new solver.
+    """
+    root = FactNode({}, [])
+    for index, proof in enumerate(proofs):
+        node = root
+        for f in proof.facts:
+            node = node.children.setdefault(f, FactNode({}, []))
+        node.proofs.append(index)
+
+    results: List[Optional[ProofResult]] = [None] * len(proofs)
+    solver = z3.Solver()
+    stack: List[Optional[Tuple[Optional["Expr"], FactNode]]] = [(None, root)]
+
+    while stack:
+        entry = stack.pop()
+
+        if entry is None:
+            solver.pop()
+            continue
+
+        fact, node = entry
+
+        if fact is not None:
+            solver.push()
+            solver.add(fact.z3expr())
+            stack.append(None)
+
+        for index in node.proofs:
+            solver.push()
+            solver.add(proofs[index].expr.z3expr())
+            results[index] = ProofResult(solver.check())
+            solver.pop()
+
+        stack.extend(reversed(list(node.children.items())))
+
+    return [
+        r if r is not None and r != ProofResult.unknown else solve(p.expr, p.facts)
+        for p, r in zip(proofs, results)
+    ]
+
+
+class IncrementalSolver:
+    """
+    Solver for checking proofs one after another.
+
+    The leading facts which a proof shares with the preceding proof stay asserted, so only the
+    differing facts are retracted and asserted. Proofs which cannot be decided incrementally are
+    checked again by a new solver.
+    """
+
+    def __init__(self) -> None:
+        self.__solver = z3.Solver()
+        self.__facts: List["Expr"] = []
+
+    def check(self, proof: Proof) -> ProofResult:
+        common = 0
+        for asserted, fact in zip(self.__facts, proof.facts):
+            if asserted != fact:
+                break
+            common += 1
+
+        for _ in self.__facts[common:]:
+            self.__solver.pop()
+        del self.__facts[common:]
+
+        for fact in proof.facts[common:]:
+            self.__solver.push()
+            self.__solver.add(fact.z3expr())
+            self.__facts.append(fact)
+
+        self.__solver.push()
+        self.__solver.add(proof.expr.z3expr())
+        result = ProofResult(self.__solver.check())
+        self.__solver.pop()
+
+        return result if result != ProofResult.unknown else solve(proof.expr, proof.facts)
+
+
+class SimplificationCache:
+    """Bounded cache of simplified expressions with least recently used replacement."""
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError(f"invalid capacity {capacity}")
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.__entries: "OrderedDict[Tuple[object, ...], Expr]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __repr__(self) -> str:
+        return (
+            f"SimplificationCache(capacity={self.capacity}, size={len(self)},"
+            f" hits={self.hits}, misses={self.misses})"
+        )
+
+    def get(self, key: Tuple[object, ...]) -> Optional["Expr"]:
+        result = self.__entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.__entries.move_to_end(key)
+        return result
+
+    def put(self, key: Tuple[object, ...], expr: "Expr") -> None:
+        self.__entries[key] = expr
+        self.__entries.move_to_end(key)
+        if len(self.__entries) > self.capacity:
+            self.__entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+SIMPLIFICATION_CACHE: Optional[SimplificationCache] = None
+
+
+def enable_simplification_cache(capacity: int = 2 ** 16) -> SimplificationCache:
+    global SIMPLIFICATION_CACHE  # pylint: disable=global-statement
+    SIMPLIFICATION_CACHE = SimplificationCache(capacity)
+    return SIMPLIFICATION_CACHE
+
+
+def disable_simplification_cache() -> None:
+    global SIMPLIFICATION_CACHE  # pylint: disable=global-statement
+    SIMPLIFICATION_CACHE = None
+
+
+F = TypeVar("F", bound=Callable[..., Any])  # pylint: disable=invalid-name
+
+
+def memoized(simplified: F) -> F:
+    """Memoize the result of a simplification method if the simplification cache is enabled."""
+
+    @functools.wraps(simplified)
+    def wrapper(self: "Expr", *args: object) -> "Expr":
+        if SIMPLIFICATION_CACHE is None:
+            return simplified(self, *args)
+        # The type is part of the key, as expressions of a derived type may be equal to their base.
+        # The bases of numbers are part of the key, as they are ignored by the equality.
+        key = (simplified, self.__class__, self, self.literal_bases(), *args)
+        result = SIMPLIFICATION_CACHE.get(key)
+        if result is None:
+            result = simplified(self, *args)
+            SIMPLIFICATION_CACHE.put(key, result)
+        return result
+
+    return wrapper  # type: ignore
 
 
 class Expr(DBC):
+    __slots__ = ("_hash", "_literal_bases")
+
+    _hash: int
+    _literal_bases: Tuple[int, ...]
+
     def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
         if isinstance(other, self.__class__):
             return self.__dict__ == other.__dict__
         return NotImplemented
 
     def __hash__(self) -> int:
-        return hash(self.__class__.__name__)
+        """
+        Return a structural hash of the expression.
+
+        The hash is computed once and cached. Expressions must therefore not be modified after they
+        have been hashed, i.e. after they have been used as key of a mapping or element of a set.
+        """
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash((self.__class__, *map(hashable, self.__dict__.values())))
+            return self._hash
+
+    def literal_bases(self) -> Tuple[int, ...]:
+        """
+        Return the bases of all numbers contained in the expression.
+
+        The bases are not considered by the structural equality. Like the hash, they are computed
+        once and cached.
+        """
+        try:
+            return self._literal_bases
+        except AttributeError:
+            self._literal_bases = literal_bases(list(self.__dict__.values()))
+            return self._literal_bases
+
+    def __getstate__(self) -> dict:
+        # The cached hash must not be propagated to copies, as copies are modified regularly
+        return self.__dict__
 
     def __repr__(self) -> str:
         return generic_repr(self.__class__.__name__, self.__dict__)
@@ -137,6 +554,15 @@ class Expr(DBC):
     def check(self, facts: Optional[Sequence["Expr"]] = None) -> Proof:
         return Proof(self, facts)
 
+    def interned(self) -> "Expr":
+        """
+        Return the canonical instance of all expressions structurally equal to this expression.
+
+        Interned expressions are shared, so that comparing them is reduced to an identity check.
+        The canonical instances are only kept as long as they are referenced elsewhere.
+        """
+        return INTERNED_EXPRESSIONS.setdefault(self, self)
+
 
 class BooleanLiteral(Expr):
     @abstractmethod
@@ -244,6 +670,7 @@ class BinExpr(Expr):
             return expr.__class__(expr.left.substituted(func), expr.right.substituted(func))
         return expr
 
+    @memoized
     def simplified(self) -> Expr:
         return self.__class__(self.left.simplified(), self.right.simplified())
 
@@ -324,6 +751,7 @@ class AssExpr(Expr):
             return expr.__class__(*[t.substituted(func) for t in expr.terms])
         return expr
 
+    @memoized
     def simplified(self) -> Expr:
         terms: List[Expr] = []
         all_terms = list(self.terms)
@@ -410,6 +838,7 @@ class And(LogExpr):
     def precedence(self) -> Precedence:
         return Precedence.logical_operator
 
+    @memoized
     def simplified(self) -> Expr:
         simplified_expr = super().simplified()
         if isinstance(simplified_expr, And) and FALSE in simplified_expr.terms:
@@ -448,6 +877,7 @@ class Or(LogExpr):
     def precedence(self) -> Precedence:
         return Precedence.logical_operator
 
+    @memoized
     def simplified(self) -> Expr:
         simplified_expr = super().simplified()
         if isinstance(simplified_expr, Or) and TRUE in simplified_expr.terms:
@@ -505,6 +935,9 @@ class Number(Expr):
     def __hash__(self) -> int:
         return hash(self.value)
 
+    def literal_bases(self) -> Tuple[int, ...]:
+        return (self.base,)
+
     def __int__(self) -> int:
         return self.value
 
@@ -611,6 +1044,7 @@ class Add(AssExpr):
     def operation(self, left: int, right: int) -> int:
         return left + right
 
+    @memoized
     def simplified(self) -> Expr:
         expr = super().simplified()
         if not isinstance(expr, Add):
@@ -678,6 +1112,7 @@ class Sub(BinExpr):
     def precedence(self) -> Precedence:
         return Precedence.binary_adding_operator
 
+    @memoized
     def simplified(self) -> Expr:
         left = self.left.simplified()
         right = self.right.simplified()
@@ -704,6 +1139,7 @@ class Div(BinExpr):
     def precedence(self) -> Precedence:
         return Precedence.multiplying_operator
 
+    @memoized
     def simplified(self) -> Expr:
         left = self.left.simplified()
         right = self.right.simplified()
@@ -730,6 +1166,7 @@ class Pow(BinExpr):
     def precedence(self) -> Precedence:
         return Precedence.highest_precedence_operator
 
+    @memoized
     def simplified(self) -> Expr:
         left = self.left.simplified()
         right = self.right.simplified()
@@ -756,6 +1193,7 @@ class Mod(BinExpr):
     def precedence(self) -> Precedence:
         return Precedence.multiplying_operator
 
+    @memoized
     def simplified(self) -> Expr:
         left = self.left.simplified()
         right = self.right.simplified()
@@ -861,6 +1299,7 @@ class Attribute(Name):
             expr = expr.__class__(expr.prefix.substituted(func))
         return -expr if self.negative else expr
 
+    @memoized
     def simplified(self) -> Expr:
         expr = self.__class__(self.prefix.simplified())
         return -expr if self.negative else expr
@@ -928,6 +1367,7 @@ class AttributeExpression(Attribute, ABC):
             expr = expr.__class__(expr.prefix.substituted(func), expr.expression.substituted(func))
         return -expr if self.negative else expr
 
+    @memoized
     def simplified(self) -> Expr:
         if isinstance(self, self.__class__):
             prefix = self.prefix.simplified()
@@ -1022,6 +1462,7 @@ class Slice(Name):
             )
         return expr
 
+    @memoized
     def simplified(self) -> Expr:
         return self.__class__(
             self.prefix.simplified(), self.first.simplified(), self.last.simplified()
@@ -1066,6 +1507,7 @@ class Aggregate(Expr):
             return expr.__class__(*[e.substituted(func) for e in expr.elements])
         return expr
 
+    @memoized
     def simplified(self) -> Expr:
         return self.__class__(*[e.simplified() for e in self.elements])
 
@@ -1100,6 +1542,7 @@ class NamedAggregate(Expr):
             return expr.__class__(*[(n, e.substituted(func)) for n, e in expr.elements])
         return expr
 
+    @memoized
     def simplified(self) -> Expr:
         return self.__class__(*[(n, e.simplified()) for n, e in self.elements])
 
@@ -1112,6 +1555,7 @@ class Relation(BinExpr):
     def __neg__(self) -> Expr:
         raise NotImplementedError
 
+    @memoized
     def _simplified(self, relation_operator: Callable[[Number, Number], bool]) -> Expr:
         left = self.left.simplified()
         right = self.right.simplified()
@@ -1314,6 +1758,7 @@ class If(Expr):
             )
         return expr
 
+    @memoized
     def simplified(self) -> Expr:
         simplified_ce = [(c.simplified(), e.simplified()) for c, e in self.condition_expressions]
 
@@ -1387,6 +1832,7 @@ class Case(Expr):
             )
         return expr
 
+    @memoized
     def simplified(self) -> Expr:
         if len(self.case_statements) == 1 and self.case_statements[0][0] == Variable("others"):
             return self.case_statements[0][1]
@@ -1436,6 +1882,7 @@ class QuantifiedExpression(Expr):
     def precedence(self) -> Precedence:
         return Precedence.literal
 
+    @memoized
     def simplified(self) -> Expr:
         return self.__class__(
             self.parameter_name, self.iterable.simplified(), self.predicate.simplified()
@@ -1499,6 +1946,7 @@ class ValueRange(Expr):
     def precedence(self) -> Precedence:
         raise NotImplementedError
 
+    @memoized
     def simplified(self) -> Expr:
         return self.__class__(self.lower.simplified(), self.upper.simplified())
 
@@ -1506,6 +1954,23 @@ class ValueRange(Expr):
         raise NotImplementedError
 
 
+INTERNED_EXPRESSIONS: "weakref.WeakValueDictionary[Expr, Expr]" = weakref.WeakValueDictionary()
+
+
+def hashable(value: object) -> object:
+    if isinstance(value, (list, tuple)):
+        return tuple(hashable(v) for v in value)
+    return value
+
+
+def literal_bases(value: object) -> Tuple[int, ...]:
+    if isinstance(value, Expr):
+        return value.literal_bases()
+    if isinstance(value, (list, tuple)):
+        return tuple(b for v in value for b in literal_bases(v))
+    return ()
+
+
 def substitution(
     mapping: Mapping[Name, Expr], func: Callable[["Expr"], "Expr"] = None
 ) -> Callable[[Expr], Expr]:
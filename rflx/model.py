@@ -2,7 +2,7 @@
 import itertools
 from abc import ABC, abstractmethod
 from copy import copy
-from typing import Dict, List, Mapping, NamedTuple, Sequence, Set, Tuple
+from typing import Callable, Dict, Iterator, List, Mapping, NamedTuple, Sequence, Set, Tuple
 
 from rflx.common import flat_name, generic_repr
 from rflx.contract import ensure, invariant
@@ -27,6 +27,7 @@ from rflx.expression import (
     Number,
     Or,
     Pow,
+    Proof,
     ProofResult,
     Relation,
     Sub,
@@ -293,6 +294,14 @@ class Link(NamedTuple):
         return generic_repr(self.__class__.__name__, self._asdict())
 
 
+PROOF_BATCH_SIZE = 1024
+
+
+class Obligation(NamedTuple):
+    proofs: Sequence[Proof]
+    verify: Callable[[], None]
+
+
 def valid_message_field_types(message: "AbstractMessage") -> bool:
     for t in message.types.values():
         if not isinstance(t, (Scalar, Composite, AbstractMessage)):
@@ -309,22 +318,29 @@ class AbstractMessage(Type):
 
         self.structure = structure
         self.__types = types
+        incoming: Dict[Field, List[Link]] = {}
+        outgoing: Dict[Field, List[Link]] = {}
+        for l in structure:
+            incoming.setdefault(l.target, []).append(l)
+            outgoing.setdefault(l.source, []).append(l)
+        self.__incoming = {f: tuple(links) for f, links in incoming.items()}
+        self.__outgoing = {f: tuple(links) for f, links in outgoing.items()}
 
         if structure or types:
             self.__verify()
             self.__fields = self.__compute_topological_sorting()
+            self.__all_fields = (INITIAL, *self.__fields, FINAL)
+            self.__field_positions = {f: i for i, f in enumerate(self.__all_fields)}
             self.__types = {f: self.__types[f] for f in self.__fields}
-            self.__paths = {f: self.__compute_paths(f) for f in self.all_fields}
-            self.__definite_predecessors = {
-                f: self.__compute_definite_predecessors(f) for f in self.all_fields
-            }
-            self.__field_condition = {
-                f: self.__compute_field_condition(f).simplified() for f in self.all_fields
-            }
+            self.__ancestors = self.__compute_ancestors()
+            self.__definite_predecessors = self.__compute_definite_predecessors()
+            self.__field_condition = self.__compute_field_conditions()
             self.__verify_conditions()
         else:
             self.__fields = ()
-            self.__paths = {}
+            self.__all_fields = (INITIAL, FINAL)
+            self.__field_positions = {INITIAL: 0, FINAL: 1}
+            self.__ancestors = {}
             self.__definite_predecessors = {}
             self.__field_condition = {}
 
@@ -348,7 +364,7 @@ class AbstractMessage(Type):
 
     @property
     def all_fields(self) -> Tuple[Field, ...]:
-        return (INITIAL, *self.__fields, FINAL)
+        return self.__all_fields
 
     @property
     def definite_fields(self) -> Tuple[Field, ...]:
@@ -360,25 +376,36 @@ class AbstractMessage(Type):
         """Return fields and corresponding types topologically sorted."""
         return self.__types
 
-    def incoming(self, field: Field) -> Sequence[Link]:
-        return [l for l in self.structure if l.target == field]
+    def incoming(self, field: Field) -> Tuple[Link, ...]:
+        """
+        Return the links to the given field.
+
+        The links of all fields are indexed when the message is created. Later changes of the
+        structure are not reflected in the index.
+        """
+        return self.__incoming.get(field, ())
+
+    def outgoing(self, field: Field) -> Tuple[Link, ...]:
+        """
+        Return the links from the given field.
+
+        The links of all fields are indexed when the message is created. Later changes of the
+        structure are not reflected in the index.
+        """
+        return self.__outgoing.get(field, ())
 
-    def outgoing(self, field: Field) -> Sequence[Link]:
-        return [l for l in self.structure if l.source == field]
+    def field_position(self, field: Field) -> int:
+        """Return the position of a field in the topologically sorted fields including INITIAL."""
+        try:
+            return self.__field_positions[field]
+        except KeyError:
+            raise ValueError(f'field "{field.name}" not found')
 
     def predecessors(self, field: Field) -> Tuple[Field, ...]:
-        if field == INITIAL:
-            return ()
-        if field == FINAL:
-            return self.fields
-        return self.fields[: self.fields.index(field)]
+        return self.__all_fields[1 : self.field_position(field)]
 
     def successors(self, field: Field) -> Tuple[Field, ...]:
-        if field == INITIAL:
-            return self.fields
-        if field == FINAL:
-            return ()
-        return self.fields[self.fields.index(field) + 1 :]
+        return self.__all_fields[self.field_position(field) + 1 : -1]
 
     def direct_predecessors(self, field: Field) -> Sequence[Field]:
         return list(dict.fromkeys([l.source for l in self.incoming(field)]))
@@ -390,6 +417,29 @@ class AbstractMessage(Type):
         """Return preceding fields which are part of all possible paths."""
         return self.__definite_predecessors[field]
 
+    def paths(self, field: Field) -> Iterator[Tuple[Link, ...]]:
+        """
+        Yield all paths from INITIAL to the given field.
+
+        The paths are generated lazily in depth-first order, i.e., paths with a common prefix are
+        generated consecutively. Only links to fields from which the given field is reachable are
+        followed, so that no search is wasted on dead ends.
+        """
+
+        def extend(path: Tuple[Link, ...], source: Field) -> Iterator[Tuple[Link, ...]]:
+            for l in self.outgoing(source):
+                if l.target == field:
+                    yield (*path, l)
+                elif l.target in ancestors:
+                    yield from extend((*path, l), l.target)
+
+        if field == INITIAL:
+            yield ()
+            return
+
+        ancestors = self.__ancestors[field]
+        yield from extend((), INITIAL)
+
     def field_condition(self, field: Field) -> Expr:
         return self.__field_condition[field]
 
@@ -609,20 +659,26 @@ class AbstractMessage(Type):
             c for n, t in scalar_types for c in t.constraints(name=n, proof=True)
         ]
 
-    def __prove_conflicting_conditions(self) -> None:
+    def __prove_conflicting_conditions(self) -> Iterator[Obligation]:
         for f in (INITIAL, *self.__fields):
             for i1, c1 in enumerate(self.outgoing(f)):
                 for i2, c2 in enumerate(self.outgoing(f)):
                     if i1 != i2:
                         conflict = And(c1.condition, c2.condition)
                         proof = conflict.check(self.__type_constraints(conflict))
-                        if proof.result == ProofResult.sat:
-                            raise ModelError(
-                                f'conflicting conditions {i1} and {i2} for field "{f.name}"'
-                                f' in "{self.identifier}"'
-                            )
 
-    def __prove_reachability(self) -> None:
+                        def verify(
+                            proof: Proof = proof, f: Field = f, i1: int = i1, i2: int = i2
+                        ) -> None:
+                            if proof.result == ProofResult.sat:
+                                raise ModelError(
+                                    f'conflicting conditions {i1} and {i2} for field "{f.name}"'
+                                    f' in "{self.identifier}"'
+                                )
+
+                        yield Obligation([proof], verify)
+
+    def __prove_reachability(self) -> Iterator[Obligation]:
         def has_final(field: Field) -> bool:
             if field == FINAL:
                 return True
@@ -631,46 +687,75 @@ class AbstractMessage(Type):
                     return True
             return False
 
-        for f in (INITIAL, *self.__fields):
-            if not has_final(f):
-                raise ModelError(f'no path to FINAL for field "{f.name}"')
+        def verify_paths_to_final() -> None:
+            for f in (INITIAL, *self.__fields):
+                if not has_final(f):
+                    raise ModelError(f'no path to FINAL for field "{f.name}"')
+
+        yield Obligation([], verify_paths_to_final)
 
         for f in (*self.__fields, FINAL):
-            errors = []
-            for path in self.__paths[f]:
-                facts = [fact for link in path for fact in self.__link_expression(link)]
-                conditions = [link.condition for link in path]
-                if f != FINAL:
-                    facts.extend(
-                        expression_list(Or(*[o.condition for o in self.outgoing(f)]).simplified())
-                    )
-                proof = TRUE.check([*facts, *conditions])
-                if proof.result == ProofResult.sat:
-                    break
 
-                path_message = " -> ".join([l.target.name for l in path])
-                errors.append(f"[{path_message}]:\n   {proof.error}")
-            else:
+            def verify(f: Field = f) -> None:
+                paths: List[Tuple[Link, ...]] = []
+                outgoing = (
+                    expression_list(Or(*[o.condition for o in self.outgoing(f)]).simplified())
+                    if f != FINAL
+                    else []
+                )
+
+                def proofs() -> Iterator[Proof]:
+                    # The facts are ordered by the links of the path, so that consecutive paths,
+                    # which share a prefix, also share the leading facts of their proofs
+                    for path in self.paths(f):
+                        paths.append(path)
+                        facts = [
+                            fact
+                            for link in path
+                            for fact in [*self.__link_expression(link), link.condition]
+                        ]
+                        yield TRUE.check([*outgoing, *facts])
+
+                checked = Proof.check_until_sat(proofs())
+                if checked and checked[-1].result == ProofResult.sat:
+                    return
+
+                errors = []
+                for path, proof in zip(paths, checked):
+                    path_message = " -> ".join([l.target.name for l in path])
+                    errors.append(f"[{path_message}]:\n   {proof.error}")
                 error_message = "\n   ".join(errors)
                 raise ModelError(
                     f'unreachable field "{f.name}" in "{self.identifier}"\n{error_message}'
                 )
 
-    def __prove_contradictions(self) -> None:
+            yield Obligation([], verify)
+
+    def __prove_contradictions(self) -> Iterator[Obligation]:
         for f in (INITIAL, *self.__fields):
-            for path in self.__paths[f]:
+            for path in self.paths(f):
                 facts = [fact for link in path for fact in self.__link_expression(link)]
                 for index, c in enumerate(self.outgoing(f)):
                     contradiction = c.condition
                     constraints = self.__type_constraints(contradiction)
-                    proof = contradiction.check([*constraints, *facts])
-                    if proof.result == ProofResult.unsat:
-                        path_message = " -> ".join([l.target.name for l in path])
-                        raise ModelError(
-                            f'contradicting condition {index} from field "{f.name}" to'
-                            f' "{c.target.name}" on path [{path_message}] in "{self.identifier}"'
-                            f" ({proof.error})"
-                        )
+                    proof = contradiction.check([*facts, *constraints])
+
+                    def verify(
+                        proof: Proof = proof,
+                        f: Field = f,
+                        path: Tuple[Link, ...] = path,
+                        index: int = index,
+                        c: Link = c,
+                    ) -> None:
+                        if proof.result == ProofResult.unsat:
+                            path_message = " -> ".join([l.target.name for l in path])
+                            raise ModelError(
+                                f'contradicting condition {index} from field "{f.name}" to'
+                                f' "{c.target.name}" on path [{path_message}]'
+                                f' in "{self.identifier}" ({proof.error})'
+                            )
+
+                    yield Obligation([proof], verify)
 
     @staticmethod
     def __target_first(link: Link) -> Expr:
@@ -700,31 +785,39 @@ class AbstractMessage(Type):
             Equal(Length("Message"), Add(Sub(Last("Message"), First("Message")), Number(1)),),
         ]
 
-    def __prove_field_positions(self) -> None:
+    def __prove_field_positions(self) -> Iterator[Obligation]:
         for f in self.__fields:
-            for p, l in [(p, p[-1]) for p in self.__paths[f] if p]:
+            for p, l in ((p, p[-1]) for p in self.paths(f) if p):
                 positive = GreaterEqual(self.__target_length(l), Number(0))
                 facts = [f for l in p for f in self.__link_expression(l)]
                 facts.extend(self.__type_constraints(positive))
-                proof = positive.check(facts)
-                if proof.result != ProofResult.sat:
-                    path_message = " -> ".join([l.target.name for l in p])
-                    raise ModelError(
-                        f'negative length for field "{f.name}" on path {path_message}'
-                        f' in "{self.identifier}" ({proof.error})'
-                    )
+                positive_proof = positive.check(facts)
 
                 start = GreaterEqual(self.__target_first(l), First("Message"))
-                facts.extend(self.__type_constraints(start))
-                proof = start.check(facts)
-                if proof.result != ProofResult.sat:
+                facts = [*facts, *self.__type_constraints(start)]
+                start_proof = start.check(facts)
+
+                def verify(
+                    positive_proof: Proof = positive_proof,
+                    start_proof: Proof = start_proof,
+                    f: Field = f,
+                    p: Tuple[Link, ...] = p,
+                ) -> None:
                     path_message = " -> ".join([l.target.name for l in p])
-                    raise ModelError(
-                        f'start of field "{f.name}" on path {path_message} before'
-                        f' message start in "{self.identifier} ({proof.error})'
-                    )
+                    if positive_proof.result != ProofResult.sat:
+                        raise ModelError(
+                            f'negative length for field "{f.name}" on path {path_message}'
+                            f' in "{self.identifier}" ({positive_proof.error})'
+                        )
+                    if start_proof.result != ProofResult.sat:
+                        raise ModelError(
+                            f'start of field "{f.name}" on path {path_message} before'
+                            f' message start in "{self.identifier} ({start_proof.error})'
+                        )
+
+                yield Obligation([positive_proof, start_proof], verify)
 
-    def __prove_coverage(self) -> None:
+    def __prove_coverage(self) -> Iterator[Obligation]:
         """
         Prove that the fields of a message cover all message bits, i.e. there are no holes in the
         message definition.
@@ -736,7 +829,7 @@ class AbstractMessage(Type):
         effectively pruning the range that this field covers from the bit range of the message. For
         the overall expression, prove that it is false for all f, i.e. no bits are left.
         """
-        for path in [p[:-1] for p in self.__paths[FINAL] if p]:
+        for path in (p[:-1] for p in self.paths(FINAL) if p):
 
             facts: Sequence[Expr]
 
@@ -766,33 +859,69 @@ class AbstractMessage(Type):
 
             # Coverage expression must be False, i.e. no bits left
             proof = TRUE.check(facts)
-            if proof.result == ProofResult.sat:
-                path_message = " -> ".join([l.target.name for l in path])
-                raise ModelError(
-                    f'path {path_message} does not cover whole message in "{self.identifier}"'
-                )
 
-    def __prove_overlays(self) -> None:
+            def verify(proof: Proof = proof, path: Tuple[Link, ...] = path) -> None:
+                if proof.result == ProofResult.sat:
+                    path_message = " -> ".join([l.target.name for l in path])
+                    raise ModelError(
+                        f'path {path_message} does not cover whole message in "{self.identifier}"'
+                    )
+
+            yield Obligation([proof], verify)
+
+    def __prove_overlays(self) -> Iterator[Obligation]:
         for f in (INITIAL, *self.__fields):
-            for p, l in [(p, p[-1]) for p in self.__paths[f] if p]:
+            for p, l in ((p, p[-1]) for p in self.paths(f) if p):
                 if l.first != UNDEFINED and isinstance(l.first, First):
                     facts = [f for l in p for f in self.__link_expression(l)]
                     overlaid = Equal(self.__target_last(l), Last(l.first.prefix))
                     proof = overlaid.check(facts)
-                    if proof.result != ProofResult.sat:
-                        raise ModelError(
-                            f'field "{f.name}" not congruent with overlaid field '
-                            f'"{l.first.prefix}" in "{self.identifier}"'
-                            f" ({proof.error})"
-                        )
+
+                    def verify(proof: Proof = proof, f: Field = f, l: Link = l) -> None:
+                        assert isinstance(l.first, First)
+                        if proof.result != ProofResult.sat:
+                            raise ModelError(
+                                f'field "{f.name}" not congruent with overlaid field '
+                                f'"{l.first.prefix}" in "{self.identifier}"'
+                                f" ({proof.error})"
+                            )
+
+                    yield Obligation([proof], verify)
 
     def _prove(self) -> None:
-        self.__prove_conflicting_conditions()
-        self.__prove_reachability()
-        self.__prove_contradictions()
-        self.__prove_coverage()
-        self.__prove_overlays()
-        self.__prove_field_positions()
+        """
+        Prove the correctness of the message.
+
+        The proofs are generated lazily and checked in batches, so that they can be distributed to
+        multiple processes without keeping the proofs of all paths in memory. The reachability of
+        each field is checked path by path when verifying, as it is proven by the first satisfiable
+        path. Failures are reported in the order in which the proofs are generated.
+        """
+        obligations = itertools.chain(
+            self.__prove_conflicting_conditions(),
+            self.__prove_reachability(),
+            self.__prove_contradictions(),
+            self.__prove_coverage(),
+            self.__prove_overlays(),
+            self.__prove_field_positions(),
+        )
+
+        while True:
+            batch: List[Obligation] = []
+            size = 0
+            for o in obligations:
+                batch.append(o)
+                size += len(o.proofs)
+                if size >= PROOF_BATCH_SIZE:
+                    break
+
+            if not batch:
+                return
+
+            Proof.check_all([p for o in batch for p in o.proofs])
+
+            for o in batch:
+                o.verify()
 
     def __compute_topological_sorting(self) -> Tuple[Field, ...]:
         """Return fields topologically sorted (Kahn's algorithm)."""
@@ -810,31 +939,41 @@ class AbstractMessage(Type):
             raise ModelError(f'structure of "{self.identifier}" contains cycle')
         return tuple(f for f in result if f not in [INITIAL, FINAL])
 
-    def __compute_paths(self, final: Field) -> Set[Tuple[Link, ...]]:
-        if final == INITIAL:
-            return {()}
-        return set(
-            itertools.chain.from_iterable(
-                ((p + (l,) for p in self.__compute_paths(l.source)) for l in self.incoming(final))
-            )
-        )
+    def __compute_ancestors(self) -> Dict[Field, Set[Field]]:
+        """Return all fields from which a field is reachable, computed in topological order."""
+        ancestors: Dict[Field, Set[Field]] = {}
+        for f in self.all_fields:
+            ancestors[f] = set()
+            for l in self.incoming(f):
+                ancestors[f] |= ancestors[l.source] | {l.source}
+        return ancestors
 
-    def __compute_definite_predecessors(self, final: Field) -> Tuple[Field, ...]:
-        return tuple(
-            f
-            for f in self.__fields
-            if all(any(f == pf.source for pf in p) for p in self.__paths[final])
-        )
+    def __compute_definite_predecessors(self) -> Dict[Field, Tuple[Field, ...]]:
+        """
+        Return the fields which are part of all paths to a field.
 
-    def __compute_field_condition(self, final: Field) -> Expr:
-        if final == INITIAL:
-            return TRUE
-        return Or(
-            *[
-                And(self.__compute_field_condition(l.source), l.condition)
-                for l in self.incoming(final)
-            ]
-        )
+        The definite predecessors are the dominators of a field in the graph of the message, which
+        are determined by a single pass over the topologically sorted fields instead of by
+        enumerating all paths.
+        """
+        dominators: Dict[Field, Set[Field]] = {}
+        for f in self.all_fields:
+            incoming = self.incoming(f)
+            dominators[f] = (
+                set.intersection(*[dominators[l.source] | {l.source} for l in incoming])
+                if incoming
+                else set()
+            )
+        return {f: tuple(p for p in self.__fields if p in dominators[f]) for f in self.all_fields}
+
+    def __compute_field_conditions(self) -> Dict[Field, Expr]:
+        """Return the conditions of all fields, each based on the conditions of its predecessors."""
+        conditions: Dict[Field, Expr] = {INITIAL: TRUE}
+        for f in self.all_fields[1:]:
+            conditions[f] = Or(
+                *[And(conditions[l.source], l.condition) for l in self.incoming(f)]
+            ).simplified()
+        return conditions
 
 
 class Message(AbstractMessage):
@@ -1 +1 @@
-from .parser import Parser, ParserError  # noqa: F401
+from .parser import Parser, ParserError, set_parser_cache, set_parser_workers  # noqa: F401
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Callable, Dict, List, Tuple
 
 from pyparsing import (
@@ -76,6 +77,84 @@ from .ast import (
     Then,
 )
 
+RESERVED_WORDS = [
+    "abort",
+    "abs",
+    "abstract",
+    "accept",
+    "access",
+    "aliased",
+    "all",
+    "and",
+    "array",
+    "at",
+    "begin",
+    "body",
+    "case",
+    "constant",
+    "declare",
+    "delay",
+    "delta",
+    "digits",
+    "do",
+    "else",
+    "elsif",
+    "end",
+    "entry",
+    "exception",
+    "exit",
+    "for",
+    "function",
+    "generic",
+    "goto",
+    "if",
+    "in",
+    "interface",
+    "is",
+    "limited",
+    "loop",
+    "mod",
+    "new",
+    "not",
+    "null",
+    "of",
+    "or",
+    "others",
+    "out",
+    "overriding",
+    "package",
+    "pragma",
+    "private",
+    "procedure",
+    "protected",
+    "raise",
+    "range",
+    "record",
+    "rem",
+    "renames",
+    "requeue",
+    "return",
+    "reverse",
+    "select",
+    "separate",
+    "some",
+    "subtype",
+    "synchronized",
+    "tagged",
+    "task",
+    "terminate",
+    "then",
+    "type",
+    "until",
+    "use",
+    "when",
+    "while",
+    "with",
+    "xor",
+    "initial",
+    "final",
+]
+
 
 def comma() -> Token:
     return Suppress(Literal(",")).setName('","')
@@ -463,84 +542,7 @@ def parse_then(string: str, location: int, tokens: ParseResults) -> Then:
 
 @fatalexceptions
 def verify_identifier(string: str, location: int, tokens: ParseResults) -> str:
-    reserved_words = [
-        "abort",
-        "abs",
-        "abstract",
-        "accept",
-        "access",
-        "aliased",
-        "all",
-        "and",
-        "array",
-        "at",
-        "begin",
-        "body",
-        "case",
-        "constant",
-        "declare",
-        "delay",
-        "delta",
-        "digits",
-        "do",
-        "else",
-        "elsif",
-        "end",
-        "entry",
-        "exception",
-        "exit",
-        "for",
-        "function",
-        "generic",
-        "goto",
-        "if",
-        "in",
-        "interface",
-        "is",
-        "limited",
-        "loop",
-        "mod",
-        "new",
-        "not",
-        "null",
-        "of",
-        "or",
-        "others",
-        "out",
-        "overriding",
-        "package",
-        "pragma",
-        "private",
-        "procedure",
-        "protected",
-        "raise",
-        "range",
-        "record",
-        "rem",
-        "renames",
-        "requeue",
-        "return",
-        "reverse",
-        "select",
-        "separate",
-        "some",
-        "subtype",
-        "synchronized",
-        "tagged",
-        "task",
-        "terminate",
-        "then",
-        "type",
-        "until",
-        "use",
-        "when",
-        "while",
-        "with",
-        "xor",
-        "initial",
-        "final",
-    ]
-    if tokens[0].lower() in reserved_words:
+    if tokens[0].lower() in RESERVED_WORDS:
         raise ParseFatalException(
             string, location, f'reserved word "{tokens[0]}" used as identifier'
         )
@@ -627,5 +629,11 @@ def parse_package_declaration(string: str, location: int, tokens: ParseResults)
     return PackageSpec(tokens[1], tokens[3].asList())
 
 
+@lru_cache(maxsize=None)
 def unit() -> Token:
+    """
+    Return the grammar of a specification file.
+
+    The grammar is created only once. Packrat parsing is enabled by the parser.
+    """
     return (specification() + StringEnd()).ignore(Regex(r"--.*"))
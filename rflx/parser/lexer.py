@@ -0,0 +1,57 @@
+import re
+from typing import List, NamedTuple
+
+IDENTIFIER_CHARACTERS = frozenset(
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$"
+)
+
+SKIPPED = re.compile(r"(?:[ \t\r\n]+|--.*)*")
+
+TOKEN = re.compile(
+    r"""
+    (?P<based>(?P<base>\d+(?:_+\d+)*)[ \t\r\n]*\#[ \t\r\n]*
+        (?P<digits>[0-9A-F]+(?:_?[0-9A-F]+)*)[ \t\r\n]*\#)
+    |(?P<number>\d+(?:_+\d+)*)
+    |(?P<word>[A-Za-z][A-Za-z0-9_]*)
+    |(?P<string>"[^"\n\r]*")
+    |(?P<symbol>\*\*|=>|<=|>=|/=|\.\.|[-+*/=<>(),;:.'&\#])
+    |(?P<error>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    start: int
+    end: int
+
+
+def tokenize(string: str) -> List[Token]:
+    """
+    Split a specification into tokens.
+
+    Whitespace and comments are skipped. Characters which cannot start any token are returned as
+    tokens of kind "error", so that the parser can report them at the right position. The last
+    token is always of kind "end" and located at the end of the string.
+    """
+    result = []
+    position = skip(string, 0)
+    length = len(string)
+
+    while position < length:
+        match = TOKEN.match(string, position)
+        assert match and match.lastgroup
+        result.append(Token(match.lastgroup, match.group(), position, match.end()))
+        position = skip(string, match.end())
+
+    result.append(Token("end", "", length, length))
+    return result
+
+
+def skip(string: str, position: int) -> int:
+    """Return the position of the first character after any whitespace and comments."""
+    match = SKIPPED.match(string, position)
+    assert match
+    return match.end()
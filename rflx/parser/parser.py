@@ -1,11 +1,20 @@
+import hashlib
 import logging
+import multiprocessing
+import os
+import pickle
+import tempfile
 import traceback
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
 from pathlib import Path
-from typing import Deque, Dict, List, Mapping, Set, Tuple
+from typing import Deque, Dict, List, Mapping, Optional, Sequence, Set, Tuple
 
-from pyparsing import ParseException, ParseFatalException
+from pyparsing import ParseException, ParseFatalException, ParserElement
 
+from rflx import __version__
 from rflx.expression import UNDEFINED, Number
 from rflx.identifier import ID
 from rflx.model import (
@@ -30,47 +39,177 @@ from rflx.model import (
     qualified_type_name,
 )
 
-from . import grammar
+from . import grammar, recursive_descent
 from .ast import Component, DerivationSpec, MessageSpec, RefinementSpec, Specification
 
 log = logging.getLogger(__name__)
 
 
 class Parser:
-    def __init__(self) -> None:
+    def __init__(self, recursive_descent: bool = False) -> None:
+        """
+        Create a parser for specification files.
+
+        By default, specifications are parsed by the grammar defined with pyparsing. The
+        recursive descent parser is an alternative, which creates the same syntax trees and
+        reports errors at the same positions.
+        """
+        self.__recursive_descent = recursive_descent
+        # Packrat parsing is a global switch of pyparsing, which affects all grammars in this
+        # process. It is enabled deliberately, as the expressions defined by infix notations
+        # require a lot of backtracking.
+        ParserElement.enablePackrat()
         self.__specifications: Deque[Specification] = deque()
         self.__evaluated_specifications: Set[str] = set()
+        self.__parsed_files: Set[Path] = set()
+        self.__parsed_in_advance: Dict[Path, Sequence[Specification]] = {}
         self.__types: Dict[ID, Type] = {**BUILTIN_TYPES, **INTERNAL_TYPES}
 
     def parse(self, specfile: Path) -> None:
         self.__parse(specfile)
 
-    def __parse(self, specfile: Path, transitions: Set[Tuple[str, str]] = None) -> None:
+    def parse_all(self, specfiles: Sequence[Path], workers: int = None) -> None:
+        """
+        Parse multiple specification files and all files referenced by their context clauses.
+
+        The files are parsed by a pool of worker processes, which is created once for all files
+        parsed by this call. All files which are known to be needed are parsed at once, followed
+        by the newly referenced files of their context clauses. The specifications are added in
+        the same order as by parsing the given files one by one. Files which cannot be parsed by
+        a worker are parsed again sequentially, so that errors are reported in the same way.
+        """
+        workers = workers or PARSER_WORKERS
+
+        if workers > 1 and not multiprocessing.current_process().daemon:
+            self.__parse_in_advance(specfiles, workers)
+
+        try:
+            for specfile in specfiles:
+                self.__parse(specfile)
+        finally:
+            self.__parsed_in_advance.clear()
+
+    def __parse_in_advance(self, specfiles: Sequence[Path], workers: int) -> None:
+        known = set(self.__parsed_files)
+        pending: List[Path] = []
+
+        for specfile in specfiles:
+            if specfile.resolve() not in known:
+                known.add(specfile.resolve())
+                pending.append(specfile)
+
+        with ExitStack() as stack:
+            executor: Optional[ProcessPoolExecutor] = None
+            while pending:
+                strings: Dict[Path, str] = {}
+                for specfile in pending:
+                    try:
+                        strings[specfile] = specfile.read_text()
+                    except OSError:
+                        continue
+
+                results: Dict[Path, Sequence[Specification]] = {}
+                if PARSER_CACHE:
+                    for specfile, string in strings.items():
+                        cached_specifications = PARSER_CACHE.specifications(specfile, string)
+                        if cached_specifications is not None:
+                            results[specfile] = cached_specifications
+
+                remaining = [f for f in strings if f not in results]
+                parse = partial(parse_unit_in_worker, self.__recursive_descent)
+                if len(remaining) > 1:
+                    if executor is None:
+                        executor = stack.enter_context(
+                            ProcessPoolExecutor(workers, initializer=ParserElement.enablePackrat)
+                        )
+                    parsed = list(executor.map(parse, [strings[f] for f in remaining]))
+                else:
+                    parsed = [parse(strings[f]) for f in remaining]
+
+                for specfile, result in zip(remaining, parsed):
+                    if result is not None:
+                        results[specfile] = result
+                        if PARSER_CACHE:
+                            PARSER_CACHE.add_specifications(specfile, strings[specfile], result)
+
+                pending = []
+                for specfile, specifications in results.items():
+                    self.__parsed_in_advance[specfile.resolve()] = specifications
+                    for specification in specifications:
+                        for item in specification.context.items:
+                            dependency = specfile.parent / f"{item.lower()}.rflx"
+                            if dependency.resolve() not in known:
+                                known.add(dependency.resolve())
+                                pending.append(dependency)
+
+    def __parse(self, specfile: Path, transitions: List[Tuple[str, str]] = None) -> None:
+        """
+        Parse a specification file and all files referenced by its context clauses.
+
+        Each file is parsed only once. The specifications are added after the specifications of
+        their dependencies, so that they are evaluated in topological order. The transitions are
+        the context items on the path from the initially parsed file to the current file.
+        """
+        filename = specfile.resolve()
+
+        if filename in self.__parsed_files:
+            return
+
         log.info("Parsing %s", specfile)
 
         if not transitions:
-            transitions = set()
-
-        with open(specfile, "r") as filehandle:
-            try:
-                for specification in grammar.unit().parseFile(filehandle):
-                    check_naming(specfile.name, specification.package.identifier)
-                    self.__specifications.appendleft(specification)
-                    for item in specification.context.items:
-                        transition = (specification.package.identifier, item)
-                        if transition in transitions:
-                            raise ParserError(
-                                f'dependency cycle due to context item "{item}"'
-                                f' in "{specification.package.identifier}"'
-                            )
-                        transitions.add(transition)
-                        self.__parse(specfile.parent / f"{item.lower()}.rflx", transitions)
-            except (ParseException, ParseFatalException) as e:
-                raise ParserError("\n" + ParseException.explain(e, 0))
+            transitions = []
+
+        if filename in self.__parsed_in_advance:
+            specifications = self.__parsed_in_advance[filename]
+        else:
+            with open(specfile, "r") as filehandle:
+                try:
+                    specifications = self.__parse_file(specfile, filehandle.read())
+                except (ParseException, ParseFatalException) as e:
+                    raise ParserError("\n" + ParseException.explain(e, 0))
+
+        for specification in specifications:
+            check_naming(specfile.name, specification.package.identifier)
+            for item in specification.context.items:
+                transition = (specification.package.identifier, item)
+                if transition in transitions:
+                    raise ParserError(
+                        f'dependency cycle due to context item "{item}"'
+                        f' in "{specification.package.identifier}"'
+                    )
+                transitions.append(transition)
+                self.__parse(specfile.parent / f"{item.lower()}.rflx", transitions)
+                transitions.pop()
+            self.__specifications.append(specification)
+
+        self.__parsed_files.add(filename)
 
     def parse_string(self, string: str) -> None:
-        for specification in grammar.unit().parseString(string):
-            self.__specifications.appendleft(specification)
+        """
+        Parse the specifications contained in a string.
+
+        Context clauses are not resolved. The specifications are added after all previously
+        parsed specifications, so that they can refer to the types of these specifications.
+        """
+        for specification in self.__unit(string):
+            self.__specifications.append(specification)
+
+    def __parse_file(self, specfile: Path, string: str) -> Sequence[Specification]:
+        if PARSER_CACHE:
+            cached_specifications = PARSER_CACHE.specifications(specfile, string)
+            if cached_specifications is not None:
+                return cached_specifications
+
+        specifications = list(self.__unit(string))
+
+        if PARSER_CACHE:
+            PARSER_CACHE.add_specifications(specfile, string, specifications)
+
+        return specifications
+
+    def __unit(self, string: str) -> Sequence[Specification]:
+        return parse_unit(string, self.__recursive_descent)
 
     def create_model(self) -> Model:
         for specification in self.__specifications:
@@ -125,6 +264,86 @@ class ParserError(Exception):
     pass
 
 
+class ParserCache:
+    """
+    Persistent cache of parsed specification files.
+
+    The specifications of each file are stored in a separate file, which is named by a hash of the
+    path and the content of the specification file and the version of RecordFlux. Files are
+    replaced atomically, so that a cache directory can be shared by multiple processes.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def specifications(self, specfile: Path, string: str) -> Optional[List[Specification]]:
+        try:
+            with open(self.__path(specfile, string), "rb") as f:
+                specifications = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError):
+            return None
+        return specifications if isinstance(specifications, list) else None
+
+    def add_specifications(
+        self, specfile: Path, string: str, specifications: Sequence[Specification]
+    ) -> None:
+        path = self.__path(specfile, string)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=path.parent, delete=False) as f:
+            pickle.dump(list(specifications), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, path)
+
+    def __path(self, specfile: Path, string: str) -> Path:
+        key = hashlib.sha256(
+            f"{__version__}\0{specfile.resolve()}\0{string}".encode("utf-8")
+        ).hexdigest()
+        return self.directory / key[:2] / f"{key}.pickle"
+
+
+PARSER_CACHE: Optional[ParserCache] = None
+
+
+def set_parser_cache(directory: Optional[Path]) -> None:
+    """Enable the persistent cache of parsed files in the given directory, or disable it if None."""
+    global PARSER_CACHE  # pylint: disable=global-statement
+    PARSER_CACHE = ParserCache(directory) if directory else None
+
+
+PARSER_WORKERS = 1
+
+
+def set_parser_workers(workers: int) -> int:
+    """
+    Set the default number of processes used for parsing multiple files at once.
+
+    The previous number is returned, so that it can be restored.
+    """
+    if workers < 1:
+        raise ValueError(f"invalid number of workers {workers}")
+    global PARSER_WORKERS  # pylint: disable=global-statement
+    previous = PARSER_WORKERS
+    PARSER_WORKERS = workers
+    return previous
+
+
+def parse_unit(string: str, use_recursive_descent: bool) -> Sequence[Specification]:
+    if use_recursive_descent:
+        return recursive_descent.parse(string)
+    try:
+        return grammar.unit().parseString(string)
+    finally:
+        # The packrat cache would otherwise keep the results of the last parse alive
+        ParserElement.resetCache()
+
+
+def parse_unit_in_worker(use_recursive_descent: bool, string: str) -> Optional[List[Specification]]:
+    """Parse a specification file, or return None if it is invalid."""
+    try:
+        return list(parse_unit(string, use_recursive_descent))
+    except (ParseException, ParseFatalException):
+        return None
+
+
 def message_types(types: Mapping[ID, Type]) -> Mapping[ID, Message]:
     return {n: m for n, m in types.items() if isinstance(m, Message)}
 
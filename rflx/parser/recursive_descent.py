@@ -0,0 +1,688 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from pyparsing import ParseException, ParseFatalException, alphanums
+
+from rflx.expression import (
+    TRUE,
+    UNDEFINED,
+    Add,
+    Aggregate,
+    And,
+    Div,
+    Equal,
+    Expr,
+    First,
+    Greater,
+    GreaterEqual,
+    Last,
+    Length,
+    Less,
+    LessEqual,
+    Mul,
+    NotEqual,
+    Number,
+    Or,
+    Pow,
+    Sub,
+    Variable,
+)
+from rflx.identifier import ID
+from rflx.model import (
+    Array,
+    Enumeration,
+    ModelError,
+    ModularInteger,
+    RangeInteger,
+    Type,
+    is_builtin_type,
+    qualified_type_name,
+)
+
+from .ast import (
+    Component,
+    ContextSpec,
+    DerivationSpec,
+    MessageSpec,
+    PackageSpec,
+    ReferenceSpec,
+    RefinementSpec,
+    Specification,
+    Then,
+)
+from .grammar import RESERVED_WORDS, check_aggregate_elements
+from .lexer import IDENTIFIER_CHARACTERS, TOKEN, Token, skip, tokenize
+
+T = TypeVar("T")
+
+BASED_NUMERAL = re.compile(r"[0-9A-F]+(?:_?[0-9A-F]+)*")
+
+COMMENTS = re.compile(r"(?:[ \t\r\n]*--.*)*")
+
+WORD_CHARACTERS = frozenset(alphanums + "_")
+
+MATHEMATICAL_OPERATORS: List[Dict[str, Callable[[Expr, Expr], Expr]]] = [
+    {"**": Pow},
+    {"*": Mul, "/": Div},
+    {"+": Add, "-": Sub},
+]
+
+RELATIONAL_OPERATORS: Dict[str, Callable[[Expr, Expr], Expr]] = {
+    "<=": LessEqual,
+    ">=": GreaterEqual,
+    "=": Equal,
+    "/=": NotEqual,
+    "<": Less,
+    ">": Greater,
+}
+
+LOGICAL_OPERATORS: Dict[str, Callable[[Expr, Expr], Expr]] = {"and": And, "or": Or}
+
+ATTRIBUTES: Dict[str, Callable[[str], Expr]] = {"First": First, "Last": Last, "Length": Length}
+
+TypeDefinition = Callable[[ID], Type]
+
+
+def parse(string: str) -> List[Specification]:
+    """
+    Return the specifications contained in a string.
+
+    The result and the raised exceptions are the same as those of the grammar defined in the
+    grammar module. Alternatives are tried in the same order as by the grammar, so that the same
+    errors are reported at the same positions. The descriptions of expected elements in error
+    messages may differ.
+    """
+    return SpecificationParser(string.expandtabs()).specification()
+
+
+class SpecificationParser:
+    def __init__(self, string: str) -> None:
+        self.__string = string
+        self.__tokens = tokenize(string)
+        self.__index = 0
+        self.__actions = True
+
+    def specification(self) -> List[Specification]:
+        result = []
+
+        try:
+            context = []
+            while self.__keyword("with"):
+                self.__index += 1
+                context.append(self.unqualified_identifier())
+                self.__expect(";")
+
+            if self.__keyword("package"):
+                result.append(Specification(ContextSpec(context), self.package_declaration()))
+            else:
+                self.__index = 0
+        except ParseException as e:
+            raise ParseFatalException(e.pstr, e.loc, e.msg)
+
+        if self.__current.kind != "end":
+            raise self.__error(self.__current.start, "end of text")
+
+        return result
+
+    def package_declaration(self) -> PackageSpec:
+        location = self.__expect_keyword("package").start
+        identifier = self.unqualified_identifier()
+        self.__expect_keyword("is")
+
+        types = []
+        while True:
+            if self.__keyword("type"):
+                types.append(self.type_declaration())
+            elif self.__keyword("for"):
+                types.append(self.type_refinement())
+            else:
+                break
+
+        self.__expect_keyword("end")
+        end_identifier = self.unqualified_identifier()
+        self.__expect(";")
+
+        if identifier.startswith("RFLX"):
+            raise self.__fatal(
+                location, f'illegal prefix "RFLX" in package identifier "{identifier}"'
+            )
+        if identifier != end_identifier:
+            raise self.__fatal(location, "inconsistent package identifiers")
+
+        return PackageSpec(identifier, types)
+
+    def type_declaration(self) -> Type:
+        location = self.__expect_keyword("type").start
+        name = self.unqualified_identifier()
+        self.__expect_keyword("is")
+        definition = self.__type_definition(name)
+        self.__expect(";")
+
+        try:
+            if is_builtin_type(name):
+                raise self.__fatal(location, f'illegal redefinition of built-in type "{name}"')
+            return definition(ID("__PACKAGE__") * name)
+        except ParseFatalException as e:
+            raise e
+        except ModelError as e:
+            raise self.__fatal(location, str(e))
+        except Exception as e:
+            raise self.__fatal(location, f"implementation error ({e})")
+
+    def type_refinement(self) -> RefinementSpec:
+        self.__expect_keyword("for")
+        pdu = self.qualified_identifier()
+        self.__expect_keyword("use")
+        self.__expect("(")
+        field = self.unqualified_identifier()
+        self.__expect_keyword("=>")
+        sdu = self.qualified_identifier()
+        self.__expect(")")
+        condition = self.__value_constraint() if self.__keyword("if") else TRUE
+        self.__expect(";")
+        return RefinementSpec(pdu, field, sdu, condition)
+
+    def __type_definition(self, name: str) -> TypeDefinition:
+        # pylint: disable=too-many-return-statements
+        token = self.__current
+
+        if token.text == "(":
+            return self.__enumeration_type_definition(name)
+
+        if self.__keyword("range"):
+            self.__index += 1
+            first = self.mathematical_expression()
+            self.__expect("..")
+            last = self.mathematical_expression()
+            self.__expect_keyword("with")
+            size = self.__size_aspect()[1]
+            return lambda identifier: RangeInteger(identifier, first, last, size)
+
+        if self.__keyword("mod"):
+            self.__index += 1
+            modulus = self.mathematical_expression()
+            return lambda identifier: ModularInteger(identifier, modulus)
+
+        if self.__keyword("message"):
+            self.__index += 1
+            components = self.__component_list()
+            self.__expect_keyword("end", "message")
+            return lambda identifier: MessageSpec(identifier, components)
+
+        if self.__keyword("null", "message"):
+            self.__index += 2
+            return lambda identifier: MessageSpec(identifier, [])
+
+        if self.__keyword("new"):
+            self.__index += 1
+            base = self.qualified_identifier()
+            return lambda identifier: DerivationSpec(identifier, base)
+
+        if self.__keyword("array", "of"):
+            self.__index += 2
+            element_type = self.unqualified_identifier()
+            return lambda identifier: Array(
+                identifier, ReferenceSpec(qualified_type_name(element_type, ID("__PACKAGE__")))
+            )
+
+        raise self.__error(token.start, "type definition")
+
+    def __enumeration_type_definition(self, name: str) -> TypeDefinition:
+        self.__expect("(")
+
+        elements: List[Tuple[str, Number]] = []
+        literal = self.unqualified_identifier()
+        if self.__keyword("=>"):
+            self.__index += 1
+            elements.append((literal, self.numeric_literal()))
+            while self.__current.text == ",":
+                self.__index += 1
+                literal = self.unqualified_identifier()
+                self.__expect_keyword("=>")
+                elements.append((literal, self.numeric_literal()))
+        else:
+            elements.append((literal, Number(0)))
+            while self.__current.text == ",":
+                self.__index += 1
+                elements.append((self.unqualified_identifier(), Number(len(elements))))
+
+        self.__expect(")")
+        self.__expect_keyword("with")
+
+        aspects: Dict[str, Any] = dict([self.__enumeration_aspect()])
+        while self.__current.text == "," and self.__enumeration_aspect_follows(1):
+            self.__index += 1
+            aspects.update([self.__enumeration_aspect()])
+
+        def enumeration(identifier: ID) -> Type:
+            literals = dict(elements)
+            if len(literals) < len(elements):
+                raise ModelError(f'"{name}" contains duplicate elements')
+            return Enumeration(
+                identifier, literals, aspects["size"], aspects.get("always_valid", False)
+            )
+
+        return enumeration
+
+    def __enumeration_aspect_follows(self, offset: int) -> bool:
+        return (
+            self.__keyword("Size", offset=offset)
+            or self.__tokens[self.__index + offset].text == "Always_Valid"
+        )
+
+    def __enumeration_aspect(self) -> Tuple[str, Any]:
+        if self.__keyword("Size"):
+            return self.__size_aspect()
+
+        if self.__current.text != "Always_Valid":
+            raise self.__error(self.__current.start, '"Size" or "Always_Valid"')
+        self.__index += 1
+
+        if not self.__keyword("=>"):
+            return ("always_valid", True)
+        self.__index += 1
+
+        value = self.__current.text
+        if value not in ("True", "False") or not self.__keyword(value):
+            raise self.__error(self.__current.start, '"True" or "False"')
+        self.__index += 1
+        return ("always_valid", value == "True")
+
+    def __size_aspect(self) -> Tuple[str, Expr]:
+        self.__expect_keyword("Size")
+        self.__expect_keyword("=>")
+        return ("size", self.mathematical_expression())
+
+    def __component_list(self) -> List[Component]:
+        components = []
+
+        if self.__keyword("null"):
+            self.__index += 1
+            then = self.__then()
+            self.__expect(";")
+            components.append(Component("null", "null", [then]))
+
+        for keyword, caseless in [("end", False), ("Message", True)]:
+            if self.__keyword(keyword, caseless=caseless):
+                location = (
+                    self.__tokens[self.__index - 1].end if components else self.__current.start
+                )
+                raise self.__fatal(location, f'Found unwanted token, "{keyword}"')
+
+        components.append(self.__component_item())
+        while not self.__keyword("end") and not self.__keyword("Message", caseless=True):
+            components.append(self.__component_item())
+
+        return components
+
+    def __component_item(self) -> Component:
+        name = self.unqualified_identifier()
+        self.__expect(":")
+        type_name = self.qualified_identifier()
+
+        if not self.__keyword("then"):
+            self.__expect(";")
+            return Component(name, type_name)
+
+        thens = [self.__then()]
+        while self.__current.text == ",":
+            self.__index += 1
+            thens.append(self.__then())
+        self.__expect(";")
+        return Component(name, type_name, thens)
+
+    def __then(self) -> Then:
+        self.__expect_keyword("then")
+
+        if self.__keyword("null"):
+            self.__index += 1
+            name = "null"
+        else:
+            name = self.unqualified_identifier()
+
+        aspects: Dict[str, Expr] = {}
+        if self.__keyword("with"):
+            self.__index += 1
+            aspects.update([self.__component_aspect()])
+            while self.__current.text == "," and (
+                self.__keyword("First", offset=1) or self.__keyword("Length", offset=1)
+            ):
+                self.__index += 1
+                aspects.update([self.__component_aspect()])
+
+        condition = self.__value_constraint() if self.__keyword("if") else TRUE
+
+        return Then(
+            name, aspects.get("first", UNDEFINED), aspects.get("length", UNDEFINED), condition
+        )
+
+    def __component_aspect(self) -> Tuple[str, Expr]:
+        token = self.__current
+        if not self.__keyword("First") and not self.__keyword("Length"):
+            raise self.__error(token.start, '"First" or "Length"')
+        self.__index += 1
+        self.__expect_keyword("=>")
+        return (token.text.lower(), self.mathematical_expression())
+
+    def __value_constraint(self) -> Expr:
+        self.__expect_keyword("if")
+        return self.logical_expression()
+
+    def unqualified_identifier(self) -> str:
+        token = self.__current
+        if token.kind != "word":
+            raise self.__error(token.start, "Identifier")
+        # The grammar checks the end of an identifier after skipping the directly following
+        # comments, so that an identifier fails to match if the last comment does not end with a
+        # character of a word.
+        match = COMMENTS.match(self.__string, token.end)
+        assert match
+        end = match.end()
+        if token.end < end < len(self.__string) and self.__string[end - 1] not in WORD_CHARACTERS:
+            raise ParseException(self.__string, end, "Not at the end of a word")
+        if self.__actions and token.text.lower() in RESERVED_WORDS:
+            raise self.__fatal(token.start, f'reserved word "{token.text}" used as identifier')
+        self.__index += 1
+        return token.text
+
+    def qualified_identifier(self) -> str:
+        identifier = self.unqualified_identifier()
+        token = self.__current
+        if token.text == ".":
+            self.__index += 1
+            return f"{identifier}.{self.unqualified_identifier()}"
+        if token.text == "..":
+            raise self.__error(token.start + 1, "Identifier")
+        return identifier
+
+    def numeric_literal(self) -> Number:
+        token = self.__current
+
+        if token.kind == "based":
+            self.__index += 1
+            match = TOKEN.match(token.text)
+            assert match
+            if not self.__actions:
+                return Number(0)
+            base = int(match.group("base").replace("_", ""))
+            return Number(int(match.group("digits").replace("_", ""), base), base)
+
+        if token.kind == "number":
+            if self.__tokens[self.__index + 1].text == "#":
+                return self.__separated_based_literal()
+            self.__index += 1
+            return Number(int(token.text.replace("_", "")))
+
+        raise self.__error(token.start, "Number")
+
+    def __separated_based_literal(self) -> Number:
+        """Parse a based literal containing comments, which is not recognized by the lexer."""
+        base = int(self.__current.text.replace("_", ""))
+        position = skip(self.__string, self.__tokens[self.__index + 1].end)
+        match = BASED_NUMERAL.match(self.__string, position)
+        if not match:
+            raise self.__fatal(position, "Expected based numeral")
+        position = skip(self.__string, match.end())
+        if self.__string[position : position + 1] != "#":
+            raise self.__fatal(position, 'Expected "#"')
+        while self.__current.start <= position:
+            self.__index += 1
+        if not self.__actions:
+            return Number(0)
+        return Number(int(match.group().replace("_", ""), base), base)
+
+    def logical_expression(self) -> Expr:
+        result = self.__logical_operand()
+
+        first = True
+        while self.__current.text in LOGICAL_OPERATORS and self.__keyword(self.__current.text):
+            operator = LOGICAL_OPERATORS[self.__current.text]
+            right = self.__right_operand(self.__logical_operand, first)
+            if right is None:
+                break
+            result = operator(result, right)
+            first = False
+
+        return result
+
+    def __logical_operand(self) -> Expr:
+        index = self.__index
+        try:
+            return self.__relation()
+        except ParseException as e:
+            self.__index = index
+            location = e.loc
+
+        if self.__current.text == "(":
+            self.__index += 1
+            try:
+                result = self.logical_expression()
+                self.__expect(")")
+                return result
+            except ParseException as e:
+                self.__index = index
+                location = max(location, e.loc)
+
+        raise self.__error(location, "LogicalExpression")
+
+    def __relation(self) -> Expr:
+        left = self.mathematical_expression()
+        token = self.__current
+
+        if token.text not in RELATIONAL_OPERATORS or not self.__keyword(token.text):
+            if token.text in ("<=", ">=", "=>") and (
+                token.start == 0 or self.__string[token.start - 1] not in IDENTIFIER_CHARACTERS
+            ):
+                # the operator "<", ">" or "=" matches the first character of the token
+                raise self.__fatal(token.start + 1, "Expected MathematicalExpression")
+            raise self.__error(token.start, "relational operator")
+
+        self.__index += 1
+        return RELATIONAL_OPERATORS[token.text](left, self.__required(self.mathematical_expression))
+
+    def mathematical_expression(self, level: int = len(MATHEMATICAL_OPERATORS) - 1) -> Expr:
+        if level < 0:
+            return self.__mathematical_operand()
+
+        operators = MATHEMATICAL_OPERATORS[level]
+        result = self.mathematical_expression(level - 1)
+
+        first = True
+        while self.__current.text in operators:
+            operator = operators[self.__current.text]
+            right = self.__right_operand(lambda: self.mathematical_expression(level - 1), first)
+            if right is None:
+                break
+            result = operator(result, right)
+            first = False
+
+        return result
+
+    def __mathematical_operand(self) -> Expr:
+        index = self.__index
+        try:
+            return self.__term()
+        except ParseException as e:
+            self.__index = index
+            location = e.loc
+
+        if self.__current.text == "(":
+            self.__index += 1
+            try:
+                result = self.mathematical_expression()
+                self.__expect(")")
+                return result
+            except ParseException as e:
+                self.__index = index
+                location = max(location, e.loc)
+
+        raise self.__error(location, "MathematicalExpression")
+
+    def __term(self) -> Expr:
+        token = self.__current
+
+        if token.kind in ("number", "based"):
+            return self.numeric_literal()
+
+        if token.kind == "word":
+            identifier = self.unqualified_identifier()
+            if self.__current.text == "'":
+                self.__index += 1
+                attribute = self.__current.text
+                if attribute not in ATTRIBUTES or not self.__keyword(attribute):
+                    raise self.__fatal(self.__current.start, 'Expected "First", "Last" or "Length"')
+                self.__index += 1
+                return ATTRIBUTES[attribute](identifier)
+            self.__index -= 1
+            return Variable(self.qualified_identifier())
+
+        return self.__concatenation()
+
+    def __concatenation(self) -> Aggregate:
+        result = self.__concatenation_operand()
+        elements = None
+
+        while self.__keyword("&"):
+            right = self.__right_operand(self.__concatenation_operand, elements is None)
+            if right is None:
+                break
+            elements = (elements or list(result.elements)) + list(right.elements)
+
+        return Aggregate(*elements) if elements is not None else result
+
+    def __concatenation_operand(self) -> Aggregate:
+        token = self.__current
+
+        if token.kind == "string":
+            return self.__string_literal()
+
+        if token.text != "(":
+            raise self.__error(token.start, "Concatenation")
+
+        index = self.__index
+        try:
+            return self.__array_aggregate()
+        except ParseException as e:
+            self.__index = index
+            location = e.loc
+
+        self.__index += 1
+        try:
+            result = self.__concatenation()
+            self.__expect(")")
+            return result
+        except ParseException as e:
+            self.__index = index
+            location = max(location, e.loc)
+
+        raise self.__error(location, "Concatenation")
+
+    def __array_aggregate(self) -> Aggregate:
+        location = self.__expect("(").start
+        elements = [self.numeric_literal()]
+        while self.__current.text == ",":
+            self.__index += 1
+            elements.append(self.__required(self.numeric_literal))
+        self.__expect(")")
+        if self.__actions:
+            check_aggregate_elements(elements, self.__string, location)
+        return Aggregate(*elements)
+
+    def __string_literal(self) -> Aggregate:
+        token = self.__current
+        self.__index += 1
+        value = token.text[1:-1]
+        if "\\" in value:
+            for escape, character in [(r"\t", "\t"), (r"\n", "\n"), (r"\f", "\f"), (r"\r", "\r")]:
+                value = value.replace(escape, character)
+        elements = [Number(ord(c)) for c in value]
+        if self.__actions:
+            check_aggregate_elements(elements, self.__string, token.start)
+        return Aggregate(*elements)
+
+    def __right_operand(self, parse: Callable[[], T], first: bool) -> Optional[T]:
+        """
+        Parse the operator and the right operand of a binary operation.
+
+        None is returned, if the operation is not part of the expression. The grammar checks the
+        first operation of an expression by a lookahead, which ignores parse actions and treats
+        fatal errors as mismatch. Fatal errors in the first right operand are therefore raised only
+        if they are caused by a parse action, e.g., the check for reserved words.
+        """
+        index = self.__index
+        self.__index += 1
+        try:
+            return parse()
+        except ParseException:
+            pass
+        except ParseFatalException as e:
+            if not first or self.__actions and self.__matches_without_actions(parse, index + 1):
+                raise e
+        self.__index = index
+        return None
+
+    def __matches_without_actions(self, parse: Callable[[], T], index: int) -> bool:
+        actions = self.__actions
+        self.__actions = False
+        self.__index = index
+        try:
+            parse()
+            return True
+        except (ParseException, ParseFatalException):
+            return False
+        finally:
+            self.__actions = actions
+
+    @property
+    def __current(self) -> Token:
+        return self.__tokens[self.__index]
+
+    def __keyword(
+        self, keyword: str, following: str = None, offset: int = 0, caseless: bool = False
+    ) -> bool:
+        """
+        Return whether the token at the given offset is the keyword.
+
+        Like all keywords of the grammar, the keyword must not be directly preceded or followed
+        by a character of an identifier. A keyword consisting of two words must be separated by a
+        single space.
+        """
+        token = self.__tokens[self.__index + offset]
+        text = token.text.lower() if caseless else token.text
+        if text != (keyword.lower() if caseless else keyword) or token.kind == "string":
+            return False
+        if token.start > 0 and self.__string[token.start - 1] in IDENTIFIER_CHARACTERS:
+            return False
+        if following:
+            next_token = self.__tokens[self.__index + offset + 1]
+            if next_token.text != following or self.__string[token.end : next_token.start] != " ":
+                return False
+            token = next_token
+        return self.__string[token.end : token.end + 1] not in IDENTIFIER_CHARACTERS
+
+    def __expect_keyword(self, keyword: str, following: str = None) -> Token:
+        token = self.__current
+        if not self.__keyword(keyword, following):
+            expected = f"{keyword} {following}" if following else keyword
+            raise self.__error(token.start, f'"{expected}"')
+        self.__index += 2 if following else 1
+        return token
+
+    def __expect(self, literal: str) -> Token:
+        token = self.__current
+        if token.text != literal:
+            raise self.__error(token.start, f'"{literal}"')
+        self.__index += 1
+        return token
+
+    def __required(self, parse: Callable[[], T]) -> T:
+        try:
+            return parse()
+        except ParseException as e:
+            raise ParseFatalException(e.pstr, e.loc, e.msg)
+
+    def __error(self, location: int, expected: str) -> ParseException:
+        return ParseException(self.__string, location, f"Expected {expected}")
+
+    def __fatal(self, location: int, message: str) -> ParseFatalException:
+        return ParseFatalException(self.__string, location, message)
@@ -1,4 +1,5 @@
 from .bitstring import Bitstring  # noqa: F401
+from .capture import read_capture  # noqa: F401
 from .package import Package  # noqa: F401
 from .pyrflx import PyRFLX  # noqa: F401
 from .typevalue import (  # noqa: F401
@@ -1,55 +1,188 @@
-from typing import Sequence, Union
+import sys
+from array import array
+from typing import Any, Dict, Sequence, Tuple, Union
 
 
 class Bitstring:
+    """
+    Sequence of bits.
+
+    The bits are stored in a buffer of bytes together with the position of the first bit and the
+    number of bits. Slicing creates a view on the same buffer without copying the data. The buffer
+    is either a bytes object or a read-only memoryview.
+    """
+
+    __slots__ = ("_data", "_offset", "_length")
+
     def __init__(self, bits: str = ""):
         if not self.valid_bitstring(bits):
             raise ValueError("Bitstring does not consist of only 0 and 1")
-        self._bits = bits
+        self._data: Union[bytes, memoryview] = self.__pack(int(bits, 2) if bits else 0, len(bits))
+        self._offset = 0
+        self._length = len(bits)
 
     def __add__(self, other: "Bitstring") -> "Bitstring":
-        return Bitstring(self._bits + other._bits)
+        if self.__aligned and other._offset % 8 == 0:
+            return Bitstring.__view(self.__bytes() + other.__bytes(), 0, len(self) + len(other))
+        return Bitstring.from_int((int(self) << len(other)) | int(other), len(self) + len(other))
 
     def __iadd__(self, other: "Bitstring") -> "Bitstring":
-        self._bits += other._bits
+        result = self + other
+        self._data, self._offset, self._length = result._data, result._offset, result._length
         return self
 
     def __getitem__(self, key: Union[int, slice]) -> "Bitstring":
-        if isinstance(key, slice) and isinstance(key.stop, int) and len(self._bits) < key.stop:
-            raise IndexError
-        return Bitstring(self._bits[key])
+        if isinstance(key, slice):
+            if isinstance(key.stop, int) and self._length < key.stop:
+                raise IndexError
+            start, stop, step = key.indices(self._length)
+            if step != 1:
+                return Bitstring(str(self)[key])
+            return Bitstring.__view(self._data, self._offset + start, max(0, stop - start))
+        if not -self._length <= key < self._length:
+            raise IndexError("Bitstring index out of range")
+        return Bitstring.__view(self._data, self._offset + key % self._length, 1)
 
     def __str__(self) -> str:
-        return self._bits
+        return format(int(self), f"0{self._length}b") if self._length else ""
 
     def __int__(self) -> int:
-        return int(self._bits, 2)
+        if self._length == 0:
+            return 0
+        end = self._offset + self._length
+        value = int.from_bytes(self._data[self._offset // 8 : -(-end // 8)], "big")
+        return (value >> (-end % 8)) & ((1 << self._length) - 1)
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Bitstring):
             return NotImplemented
-        return self._bits == other._bits
+        return self._length == other._length and int(self) == int(other)
 
     def __bytes__(self) -> bytes:
-        return b"".join(
-            [int(self._bits[i : i + 8], 2).to_bytes(1, "big") for i in range(0, len(self._bits), 8)]
-        )
+        if self.__aligned:
+            return self.__bytes()
+        remainder = self._length % 8
+        value = int(self)
+        result = (value >> remainder).to_bytes(self._length // 8, "big")
+        if remainder:
+            result += (value & ((1 << remainder) - 1)).to_bytes(1, "big")
+        return result
 
     def __len__(self) -> int:
-        return len(self._bits)
+        return self._length
+
+    def __getstate__(self) -> Tuple[None, Dict[str, Any]]:
+        return None, {"_data": bytes(self._data), "_offset": self._offset, "_length": self._length}
+
+    @property
+    def __aligned(self) -> bool:
+        return self._offset % 8 == 0 and self._length % 8 == 0
+
+    def __bytes(self) -> bytes:
+        assert self._offset % 8 == 0
+        return bytes(self._data[self._offset // 8 : -(-(self._offset + self._length) // 8)])
+
+    @staticmethod
+    def __pack(value: int, length: int) -> bytes:
+        padding = -length % 8
+        return (value << padding).to_bytes((length + padding) // 8, "big")
+
+    @classmethod
+    def __view(cls, data: Union[bytes, memoryview], offset: int, length: int) -> "Bitstring":
+        result = cls.__new__(cls)
+        result._data = data
+        result._offset = offset
+        result._length = length
+        return result
+
+    @classmethod
+    def from_bytes(cls, msg: Union[bytes, bytearray, memoryview]) -> "Bitstring":
+        """Return the bits of the given bytes, which are copied only if they are mutable."""
+        if isinstance(msg, memoryview) and msg.readonly:
+            data: Union[bytes, memoryview] = msg.cast("B")
+        else:
+            data = bytes(msg)
+        return cls.__view(data, 0, len(data) * 8)
 
     @classmethod
-    def from_bytes(cls, msg: bytes) -> "Bitstring":
-        return cls(format(int.from_bytes(msg, "big"), f"0{len(msg) * 8}b"))
+    def from_int(cls, value: int, length: int) -> "Bitstring":
+        """Return the binary representation of a value with at least the given number of bits."""
+        length = max(length, value.bit_length())
+        return cls.__view(cls.__pack(value, length), 0, length)
+
+    def view(self) -> Union[bytes, memoryview]:
+        """
+        Return the bytes of a byte-aligned bitstring without copying the underlying buffer.
+
+        The result is a read-only memoryview, if the bitstring does not cover the whole buffer.
+        Bitstrings which are not byte-aligned are converted into bytes.
+        """
+        if not self.__aligned:
+            return bytes(self)
+        start = self._offset // 8
+        stop = start + self._length // 8
+        if start == 0 and stop == len(self._data) and isinstance(self._data, bytes):
+            return self._data
+        return memoryview(self._data)[start:stop]
+
+    def unpack(self, size: int) -> Sequence[int]:
+        """Return the values of the consecutive elements of the given size in bits."""
+        assert size > 0 and self._length % size == 0
+        count = self._length // size
+
+        if self._offset % 8 == 0 and size in ARRAY_TYPECODES:
+            values = array(ARRAY_TYPECODES[size], self.__bytes())
+            if size > 8 and sys.byteorder == "little":
+                values.byteswap()
+            return values
+
+        data = self._data
+        mask = (1 << size) - 1
+        result = []
+        for first in range(self._offset, self._offset + count * size, size):
+            end = first + size
+            chunk = int.from_bytes(data[first // 8 : -(-end // 8)], "big")
+            result.append((chunk >> (-end % 8)) & mask)
+        return result
 
     @staticmethod
     def valid_bitstring(bitstring: str) -> bool:
-        return all((bit in ["0", "1"] for bit in bitstring))
+        return set(bitstring) <= {"0", "1"}
 
     @staticmethod
     def join(iterable: Sequence["Bitstring"]) -> "Bitstring":
-        joined_bitstring = Bitstring()
-        for i in iterable:
-            joined_bitstring += i
+        if all(b.__aligned for b in iterable):
+            data = b"".join(b.__bytes() for b in iterable)
+            return Bitstring.__view(data, 0, len(data) * 8)
+
+        value = 0
+        length = 0
+        for b in iterable:
+            value = (value << len(b)) | int(b)
+            length += len(b)
+
+        return Bitstring.from_int(value, length)
+
+
+ARRAY_TYPECODES = {8 * array(t).itemsize: t for t in reversed(["B", "H", "I", "L", "Q"])}
+
+
+def write_bits(
+    buffer: bytearray, first: int, length: int, data: Union[int, bytes, memoryview]
+) -> None:
+    """Write a value of the given number of bits into the buffer at the given bit position."""
+    end = first + length
+    if first % 8 == 0 and length % 8 == 0:
+        buffer[first // 8 : end // 8] = (
+            data.to_bytes(length // 8, "big") if isinstance(data, int) else data
+        )
+        return
 
-        return joined_bitstring
+    if not isinstance(data, int):
+        data = int.from_bytes(data, "big")
+    start = first // 8
+    stop = -(-end // 8)
+    shift = stop * 8 - end
+    mask = ((1 << length) - 1) << shift
+    value = int.from_bytes(buffer[start:stop], "big") & ~mask | (data << shift) & mask
+    buffer[start:stop] = value.to_bytes(stop - start, "big")
@@ -0,0 +1,44 @@
+import io
+import struct
+from mmap import mmap
+from typing import BinaryIO, Iterator, Union
+
+PCAP_BYTE_ORDER = {
+    b"\xd4\xc3\xb2\xa1": "<",
+    b"\x4d\x3c\xb2\xa1": "<",
+    b"\xa1\xb2\xc3\xd4": ">",
+    b"\xa1\xb2\x3c\x4d": ">",
+}
+PCAP_HEADER_LENGTH = 24
+PCAP_RECORD_HEADER_LENGTH = 16
+
+
+def read_capture(capture: Union[BinaryIO, mmap, bytes]) -> Iterator[bytes]:
+    """
+    Return the packets contained in a capture in pcap format.
+
+    The capture is read record by record, so that only one packet is kept in memory at a time.
+    Other formats are rejected, as the boundaries of the packets are unknown.
+    """
+    reader: Union[BinaryIO, mmap] = io.BytesIO(capture) if isinstance(capture, bytes) else capture
+    magic = reader.read(4)
+
+    if magic not in PCAP_BYTE_ORDER:
+        raise ValueError("unsupported capture format (pcap expected)")
+
+    if len(reader.read(PCAP_HEADER_LENGTH - len(magic))) < PCAP_HEADER_LENGTH - len(magic):
+        raise ValueError("truncated pcap header")
+
+    record_header = struct.Struct(f"{PCAP_BYTE_ORDER[magic]}IIII")
+
+    while True:
+        header = reader.read(PCAP_RECORD_HEADER_LENGTH)
+        if not header:
+            return
+        if len(header) < PCAP_RECORD_HEADER_LENGTH:
+            raise ValueError("truncated pcap record header")
+        _, _, length, _ = record_header.unpack(header)
+        packet = reader.read(length)
+        if len(packet) < length:
+            raise ValueError("truncated pcap record")
+        yield packet
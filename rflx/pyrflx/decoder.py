@@ -0,0 +1,534 @@
+import operator
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+from rflx.expression import (
+    UNDEFINED,
+    Add,
+    And,
+    BooleanFalse,
+    BooleanTrue,
+    Div,
+    Equal,
+    Expr,
+    First,
+    Greater,
+    GreaterEqual,
+    Last,
+    Length,
+    Less,
+    LessEqual,
+    Mod,
+    Mul,
+    NotEqual,
+    Number,
+    Or,
+    Pow,
+    Sub,
+    Variable,
+)
+from rflx.model import FINAL, INITIAL, Enumeration, Integer, Message, Opaque, Refinement, Scalar
+from rflx.pyrflx.bitstring import Bitstring
+
+Values = Dict[str, int]
+Evaluator = Callable[[Values, Values, Values], Any]
+
+
+class Undecidable(Exception):
+    pass
+
+
+def compile_expression(expr: Expr, literals: Mapping[str, int]) -> Evaluator:
+    """
+    Return a function which evaluates the expression for given field values, firsts and lengths.
+
+    The function raises Undecidable in all cases in which the simplification of the expression
+    after substituting the field values would not result in a number or a boolean literal.
+    """
+    # pylint: disable=too-many-return-statements
+
+    if isinstance(expr, Number):
+        number = expr.value
+        return lambda values, firsts, lengths: number
+
+    if isinstance(expr, BooleanTrue):
+        return lambda values, firsts, lengths: True
+
+    if isinstance(expr, BooleanFalse):
+        return lambda values, firsts, lengths: False
+
+    if isinstance(expr, Variable):
+        name = expr.name
+        sign = -1 if expr.negative else 1
+
+        if name in literals:
+            literal = sign * literals[name]
+            return lambda values, firsts, lengths: literal
+
+        def variable(values: Values, firsts: Values, lengths: Values) -> int:
+            try:
+                return sign * values[name]
+            except KeyError:
+                raise Undecidable(name) from None
+
+        return variable
+
+    if isinstance(expr, (Length, First, Last)) and isinstance(expr.prefix, Variable):
+        return compile_attribute(expr)
+
+    if isinstance(expr, (Add, Mul)):
+        terms = [compile_expression(t, literals) for t in expr.terms]
+        if isinstance(expr, Add):
+            return lambda values, firsts, lengths: sum(t(values, firsts, lengths) for t in terms)
+
+        def product(values: Values, firsts: Values, lengths: Values) -> int:
+            result = 1
+            for t in terms:
+                result *= t(values, firsts, lengths)
+            return result
+
+        return product
+
+    if isinstance(expr, (Sub, Div, Pow, Mod)):
+        return compile_binary_expression(expr, literals)
+
+    if isinstance(expr, (And, Or)):
+        return compile_logical_expression(expr, literals)
+
+    if isinstance(expr, (Less, LessEqual, Equal, GreaterEqual, Greater, NotEqual)):
+        return compile_relation(expr, literals)
+
+    def undecidable(values: Values, firsts: Values, lengths: Values) -> Any:
+        raise Undecidable(str(expr))
+
+    return undecidable
+
+
+def compile_attribute(expr: Union[Length, First, Last]) -> Evaluator:
+    assert isinstance(expr.prefix, Variable)
+    name = expr.prefix.name
+    sign = -1 if expr.negative else 1
+
+    def length(values: Values, firsts: Values, lengths: Values) -> int:
+        try:
+            return sign * lengths[name]
+        except KeyError:
+            raise Undecidable(name) from None
+
+    def first(values: Values, firsts: Values, lengths: Values) -> int:
+        try:
+            return sign * firsts[name]
+        except KeyError:
+            raise Undecidable(name) from None
+
+    def last(values: Values, firsts: Values, lengths: Values) -> int:
+        try:
+            return sign * (firsts[name] + lengths[name] - 1)
+        except KeyError:
+            raise Undecidable(name) from None
+
+    if isinstance(expr, Length):
+        return length
+    if isinstance(expr, First):
+        return first
+    return last
+
+
+def compile_binary_expression(
+    expr: Union[Sub, Div, Pow, Mod], literals: Mapping[str, int]
+) -> Evaluator:
+    left = compile_expression(expr.left, literals)
+    right = compile_expression(expr.right, literals)
+
+    if isinstance(expr, Sub):
+        return lambda values, firsts, lengths: left(values, firsts, lengths) - right(
+            values, firsts, lengths
+        )
+
+    if isinstance(expr, Pow):
+        return lambda values, firsts, lengths: left(values, firsts, lengths) ** right(
+            values, firsts, lengths
+        )
+
+    if isinstance(expr, Mod):
+        return lambda values, firsts, lengths: left(values, firsts, lengths) % right(
+            values, firsts, lengths
+        )
+
+    def division(values: Values, firsts: Values, lengths: Values) -> int:
+        dividend = left(values, firsts, lengths)
+        divisor = right(values, firsts, lengths)
+        if dividend % divisor != 0:
+            raise Undecidable(str(expr))
+        return dividend // divisor
+
+    return division
+
+
+def compile_logical_expression(expr: Union[And, Or], literals: Mapping[str, int]) -> Evaluator:
+    terms = [compile_expression(t, literals) for t in expr.terms]
+    dominant = not isinstance(expr, And)
+
+    def logical(values: Values, firsts: Values, lengths: Values) -> bool:
+        undecidable = None
+        for t in terms:
+            try:
+                if t(values, firsts, lengths) is dominant:
+                    return dominant
+            except Undecidable as e:
+                undecidable = e
+        if undecidable:
+            raise undecidable
+        return not dominant
+
+    return logical
+
+
+def compile_relation(
+    expr: Union[Less, LessEqual, Equal, GreaterEqual, Greater, NotEqual],
+    literals: Mapping[str, int],
+) -> Evaluator:
+    relation_operator: Callable[[int, int], bool] = {
+        Less: operator.lt,
+        LessEqual: operator.le,
+        Equal: operator.eq,
+        GreaterEqual: operator.ge,
+        Greater: operator.gt,
+        NotEqual: operator.ne,
+    }[type(expr)]
+
+    if relation_operator in [operator.eq, operator.le, operator.ge] and expr.left == expr.right:
+        return lambda values, firsts, lengths: True
+
+    left = compile_expression(expr.left, literals)
+    right = compile_expression(expr.right, literals)
+
+    return lambda values, firsts, lengths: relation_operator(
+        left(values, firsts, lengths), right(values, firsts, lengths)
+    )
+
+
+def field_bits(value: Bitstring, first: int, length: int) -> Bitstring:
+    """Return the bits of a field, which are arranged bytewise for sizes greater than one byte."""
+    if length < 8 or length % 8 == 0:
+        return value[first : first + length]
+
+    position = first
+    bytes_used_for_field = length // 8 + 1
+    bits = Bitstring()
+
+    for _ in range(bytes_used_for_field - 1):
+        bits += value[position : position + 8]
+        position += 8
+
+    k = length // bytes_used_for_field + 1
+    bits += value[position + 8 - k : first + length]
+    return bits
+
+
+def round_trips(value: Bitstring, first: int, length: int) -> bool:
+    """Return True if the bits of a field are serialized in the same arrangement as parsed."""
+    return (
+        length < 8
+        or length % 8 == 0
+        or int(field_bits(value, first, length)) == int(value[first : first + length])
+    )
+
+
+def literal_comparison(expr: Expr, literals: Mapping[str, int]) -> Optional[Tuple[str, int]]:
+    """Return field and value, if the expression compares a field with a literal or a number."""
+    if not isinstance(expr, Equal):
+        return None
+    for field, value in [(expr.left, expr.right), (expr.right, expr.left)]:
+        if (
+            isinstance(field, Variable)
+            and not field.negative
+            and field.name not in literals
+            and (
+                isinstance(value, Number)
+                or isinstance(value, Variable)
+                and not value.negative
+                and value.name in literals
+            )
+        ):
+            return field.name, value.value if isinstance(value, Number) else literals[value.name]
+    return None
+
+
+class RefinementTable:
+    """
+    Refinements of a field.
+
+    Conditions comparing a scalar field with a literal or a number are looked up by the value of
+    the field. All other conditions are evaluated one after another. If the conditions of several
+    refinements are true, the last of these refinements is selected.
+    """
+
+    def __init__(self, refinements: Sequence[Refinement], literals: Mapping[str, int]) -> None:
+        self.__tables: Dict[str, Dict[int, Tuple[int, Message]]] = {}
+        self.__conditions: List[Tuple[int, Evaluator, Message]] = []
+
+        for i, r in enumerate(refinements):
+            comparison = literal_comparison(r.condition, literals)
+            if comparison:
+                name, value = comparison
+                self.__tables.setdefault(name, {})[value] = (i, r.sdu)
+            else:
+                self.__conditions.append((i, compile_expression(r.condition, literals), r.sdu))
+
+    def __bool__(self) -> bool:
+        return bool(self.__tables or self.__conditions)
+
+    def select(self, values: Values, firsts: Values, lengths: Values) -> Optional[Message]:
+        index = -1
+        sdu = None
+
+        for name, table in self.__tables.items():
+            if name in values and values[name] in table and table[values[name]][0] > index:
+                index, sdu = table[values[name]]
+
+        for i, condition, message in self.__conditions:
+            if i < index:
+                continue
+            try:
+                if condition(values, firsts, lengths) is True:
+                    index, sdu = i, message
+            except Undecidable:
+                pass
+
+        return sdu
+
+
+class LiteralTable:
+    """
+    Literals of an enumeration indexed by name and by value.
+
+    The entries are pairs of literal name and value, which are shared by all copies of an
+    enumeration value and by all elements of an array.
+    """
+
+    __slots__ = ("names", "values", "always_valid")
+
+    def __init__(self, enumeration: Enumeration) -> None:
+        self.names: Dict[str, Tuple[str, Number]] = {
+            str(l): (str(l), v) for l, v in enumeration.literals.items()
+        }
+        self.values: Dict[int, Tuple[str, Number]] = {
+            entry[1].value: entry for entry in self.names.values()
+        }
+        self.always_valid = enumeration.always_valid
+
+    def by_name(self, name: str) -> Tuple[str, Number]:
+        if name not in self.names:
+            raise KeyError(f"{name} is not a valid enum value")
+        return self.names[name]
+
+    def by_value(self, value: int) -> Tuple[str, Number]:
+        if value in self.values:
+            return self.values[value]
+        if self.always_valid:
+            return "UNKNOWN", Number(value)
+        raise KeyError(f"Number {value} is not a valid enum value")
+
+
+class IncomingLink(NamedTuple):
+    source: str
+    condition: Evaluator
+    length: Optional[Evaluator]
+    length_variables: Sequence[str]
+    first: Optional[Evaluator]
+
+
+class OutgoingLink(NamedTuple):
+    target: str
+    condition: Evaluator
+
+
+class FieldDecoder(NamedTuple):
+    incoming: Sequence[IncomingLink]
+    outgoing: Sequence[OutgoingLink]
+    size: Optional[int]
+    range: Optional[Tuple[int, int]]
+    literals: Optional[LiteralTable]
+    opaque: bool
+    refinements: RefinementTable
+
+
+class DecodedField(NamedTuple):
+    name: str
+    first: int
+    length: int
+    value: Union[int, Tuple[str, Number], Bitstring]
+    refinement: Optional[Message]
+    # False if the size is only determined by the end of the message
+    sized: bool
+
+
+class Decoder:
+    """
+    Decoding plan of a message.
+
+    All conditions, lengths and first positions of the message are compiled into functions
+    operating directly on integer field values. A message is decoded by following the links whose
+    conditions are true. Decoding fails, if the decoding would fail or if its result is not
+    determined by the field values alone. In these cases the message needs to be parsed by the
+    generic algorithm, which also reports the cause of the error.
+    """
+
+    def __init__(self, message: Message, refinements: Sequence[Refinement]) -> None:
+        literals = {
+            str(l): int(v)
+            for t in message.types.values()
+            if isinstance(t, Enumeration)
+            for l, v in t.literals.items()
+        }
+
+        def compile_optional(expr: Expr) -> Optional[Evaluator]:
+            return compile_expression(expr, literals) if expr != UNDEFINED else None
+
+        def number(expr: Expr) -> int:
+            simplified = expr.simplified()
+            assert isinstance(simplified, Number)
+            return simplified.value
+
+        self.__initial = (
+            message.outgoing(INITIAL)[0].target.name if message.outgoing(INITIAL) else FINAL.name
+        )
+        self.__fields: Dict[str, FieldDecoder] = {}
+
+        for f, t in message.types.items():
+            self.__fields[f.name] = FieldDecoder(
+                [
+                    IncomingLink(
+                        l.source.name,
+                        compile_expression(l.condition, literals),
+                        compile_optional(l.length),
+                        [v.name for v in l.length.variables()],
+                        compile_optional(l.first),
+                    )
+                    for l in message.incoming(f)
+                ],
+                [
+                    OutgoingLink(l.target.name, compile_expression(l.condition, literals))
+                    for l in message.outgoing(f)
+                ],
+                number(t.size) if isinstance(t, Scalar) else None,
+                (number(t.first), number(t.last)) if isinstance(t, Integer) else None,
+                LiteralTable(t) if isinstance(t, Enumeration) else None,
+                isinstance(t, Opaque),
+                RefinementTable(
+                    [
+                        r
+                        for r in refinements
+                        if r.pdu.name == message.name and r.field.name == f.name
+                    ],
+                    literals,
+                ),
+            )
+
+    def decode(self, value: Bitstring) -> Optional[List[DecodedField]]:
+        # pylint: disable=too-many-branches,too-many-locals
+
+        values: Values = {}
+        firsts: Values = {INITIAL.name: 0}
+        lengths: Values = {INITIAL.name: 0}
+        result: List[DecodedField] = []
+
+        def true(condition: Evaluator) -> bool:
+            try:
+                return condition(values, firsts, lengths) is True
+            except Undecidable:
+                return False
+
+        name = self.__initial
+
+        try:
+            while name != FINAL.name:
+                field = self.__fields[name]
+
+                for l in field.incoming:
+                    if l.first and true(l.condition):
+                        first = l.first(values, firsts, lengths)
+                        break
+                else:
+                    sources = [l.source for l in field.incoming if true(l.condition)]
+                    if len(sources) > 1:
+                        sources = [s for s in sources if s in firsts and s != INITIAL.name]
+                    if not sources:
+                        return None
+                    first = firsts[sources[0]] + lengths[sources[0]]
+
+                sized = True
+                if field.size is not None:
+                    length = field.size
+                else:
+                    length = -1
+                    for l in field.incoming:
+                        if l.length and true(l.condition) and l.source in firsts:
+                            try:
+                                length = l.length(values, firsts, lengths)
+                            except Undecidable:
+                                if not field.opaque or not all(
+                                    v in firsts or v == "Message" for v in l.length_variables
+                                ):
+                                    return None
+                                length = len(value) - first
+                                sized = False
+                            break
+                    else:
+                        return None
+
+                if length < 0 or first + length > len(value):
+                    return None
+
+                if field.opaque and length % 8 != 0:
+                    return None
+
+                decoded: Union[int, Tuple[str, Number], Bitstring]
+                refinement = None
+
+                if field.size is not None:
+                    number = int(field_bits(value, first, length))
+                    if field.range and not field.range[0] <= number <= field.range[1]:
+                        return None
+                    if field.literals is None:
+                        decoded = number
+                        values[name] = number
+                    elif number in field.literals.values:
+                        decoded = field.literals.values[number]
+                        values[name] = number
+                    elif field.literals.always_valid:
+                        decoded = ("UNKNOWN", Number(number))
+                    else:
+                        return None
+                else:
+                    decoded = value[first : first + length]
+                    if field.refinements:
+                        refinement = field.refinements.select(values, firsts, lengths)
+
+                firsts[name] = first
+                lengths[name] = length
+                result.append(DecodedField(name, first, length, decoded, refinement, sized))
+
+                target = self.next_field(name, values, firsts, lengths)
+                if target is None:
+                    return None
+                name = target
+
+        except (Undecidable, KeyError, ZeroDivisionError):
+            return None
+
+        return result
+
+    def next_field(
+        self, name: str, values: Values, firsts: Values, lengths: Values
+    ) -> Optional[str]:
+        """Return the target of the first outgoing link of a field whose condition is true."""
+        if name == INITIAL.name:
+            return self.__initial
+        for o in self.__fields[name].outgoing:
+            try:
+                if o.condition(values, firsts, lengths) is True:
+                    return o.target
+            except Undecidable:
+                pass
+        return None
@@ -1,7 +1,9 @@
 from copy import copy
-from typing import Dict, Iterator
+from mmap import mmap
+from typing import BinaryIO, Dict, Iterable, Iterator, Union
 
 from rflx.common import generic_repr
+from rflx.pyrflx.capture import read_capture
 from rflx.pyrflx.typevalue import MessageValue
 
 
@@ -25,3 +27,34 @@ class Package:
 
     def __iter__(self) -> Iterator:
         return self.__messages.values().__iter__()
+
+    def parse(
+        self, key: str, messages: Iterable[bytes], skip_invalid: bool = False, lazy: bool = False
+    ) -> Iterator[MessageValue]:
+        """
+        Parse a sequence of messages.
+
+        The same message object is used for all messages. The yielded message is only valid until
+        the next message is requested, so all needed values must be retrieved before. Messages
+        which cannot be parsed are skipped if skip_invalid is set. The messages are parsed in lazy
+        mode if lazy is set (see MessageValue.parse).
+        """
+        message = self[key]
+        for data in messages:
+            try:
+                message.parse(data, lazy)
+            except (IndexError, KeyError, ValueError):
+                if not skip_invalid:
+                    raise
+                continue
+            yield message
+
+    def parse_capture(
+        self,
+        key: str,
+        capture: Union[BinaryIO, mmap, bytes],
+        skip_invalid: bool = False,
+        lazy: bool = False,
+    ) -> Iterator[MessageValue]:
+        """Parse all packets of a capture in pcap format (see parse)."""
+        return self.parse(key, read_capture(capture), skip_invalid, lazy)
@@ -1,24 +1,47 @@
 import logging
+import os
+from contextlib import ExitStack
+from functools import partial
+from itertools import islice
+from mmap import mmap
+from multiprocessing import Pool
 from pathlib import Path
-from typing import Dict, List
+from threading import Semaphore
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 from rflx.parser import Parser
+from rflx.pyrflx.capture import read_capture
 from rflx.pyrflx.typevalue import MessageValue
 
 from .package import Package
 
 log = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class PyRFLX:
     def __init__(self, files: List[str]) -> None:
         parser = Parser()
+        self.__files = files
         self.__packages: Dict[str, Package] = {}
 
         for f in files:
             if not Path(f).is_file():
                 raise FileNotFoundError(f'file not found: "{f}"')
-            parser.parse(Path(f))
+        parser.parse_all([Path(f) for f in files])
         model = parser.create_model()
         packages = set(str(m.package) for m in model.messages)
         for p in packages:
@@ -28,3 +51,126 @@ class PyRFLX:
 
     def __getitem__(self, key: str) -> Package:
         return self.__packages[key]
+
+    def __iter__(self) -> Iterator[Package]:
+        return self.__packages.values().__iter__()
+
+    def parse_parallel(
+        self,
+        package: str,
+        message: str,
+        messages: Iterable[bytes],
+        function: Callable[[MessageValue], T],
+        processes: int = None,
+        ordered: bool = True,
+        skip_invalid: bool = False,
+        lazy: bool = False,
+        chunksize: int = 32,
+    ) -> Iterator[T]:
+        """
+        Parse a sequence of messages in a pool of worker processes.
+
+        The function is applied to each parsed message inside the worker process and its result is
+        yielded. The function and its results must be picklable. Each worker loads the
+        specifications once. If ordered is not set, the results are yielded as soon as they are
+        available. The messages are parsed in lazy mode if lazy is set (see MessageValue.parse).
+        By default, one worker process is created for each CPU. The messages are passed to the
+        workers in chunks of the given size. To limit the memory usage, only a small number of
+        chunks is read in advance. The messages must already be split, e.g. by read_capture (see
+        parse_capture_parallel).
+        """
+        processes = processes or os.cpu_count() or 1
+
+        if processes < 2:
+            for m in self.__packages[package].parse(message, messages, skip_invalid, lazy):
+                yield function(m)
+            return
+
+        window = Semaphore(4 * processes)
+        stopped = False
+
+        def chunks() -> Iterator[List[bytes]]:
+            packets = iter(messages)
+            while True:
+                chunk = list(islice(packets, chunksize))
+                window.acquire()
+                if not chunk or stopped:
+                    return
+                yield chunk
+
+        with Pool(processes, initializer=init_worker, initargs=(self.__files,)) as pool:
+            parse = partial(parse_in_worker, package, message, function, skip_invalid, lazy)
+            try:
+                for results in (pool.imap if ordered else pool.imap_unordered)(parse, chunks()):
+                    window.release()
+                    yield from results
+            finally:
+                stopped = True
+                window.release()
+
+    def parse_capture_parallel(
+        self,
+        package: str,
+        message: str,
+        capture: Union[Path, BinaryIO, mmap, bytes],
+        function: Callable[[MessageValue], T],
+        processes: int = None,
+        ordered: bool = True,
+        skip_invalid: bool = False,
+        lazy: bool = False,
+        chunksize: int = 32,
+    ) -> Iterator[T]:
+        """
+        Parse all packets of a capture in pcap format in a pool of worker processes.
+
+        The capture is given as path, file, memory-mapped file or bytes. It is split into packets
+        by read_capture, which are distributed to the workers (see parse_parallel).
+        """
+        with ExitStack() as stack:
+            if isinstance(capture, Path):
+                capture = stack.enter_context(open(capture, "rb"))
+            yield from self.parse_parallel(
+                package,
+                message,
+                read_capture(capture),
+                function,
+                processes,
+                ordered,
+                skip_invalid,
+                lazy,
+                chunksize,
+            )
+
+
+WORKER: Optional[PyRFLX] = None
+WORKER_MESSAGES: Dict[Tuple[str, str], MessageValue] = {}
+
+
+def init_worker(files: Sequence[str]) -> None:
+    global WORKER  # pylint: disable=global-statement
+    WORKER = PyRFLX(list(files))
+    WORKER_MESSAGES.clear()
+
+
+def parse_in_worker(
+    package: str,
+    message: str,
+    function: Callable[[MessageValue], T],
+    skip_invalid: bool,
+    lazy: bool,
+    chunk: Sequence[bytes],
+) -> List[T]:
+    assert WORKER
+    if (package, message) not in WORKER_MESSAGES:
+        WORKER_MESSAGES[package, message] = WORKER[package][message]
+    msg = WORKER_MESSAGES[package, message]
+    results = []
+    for data in chunk:
+        try:
+            msg.parse(data, lazy)
+        except (IndexError, KeyError, ValueError):
+            if not skip_invalid:
+                raise
+            continue
+        results.append(function(msg))
+    return results
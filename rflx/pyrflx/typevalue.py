@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from copy import copy
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 
-from rflx.common import generic_repr
+from rflx.common import generic_repr, slot_names, slot_values, unique
 from rflx.expression import (
     FALSE,
     TRUE,
@@ -32,7 +33,10 @@ from rflx.model import (
     Scalar,
     Type,
 )
-from rflx.pyrflx.bitstring import Bitstring
+from rflx.pyrflx.bitstring import Bitstring, write_bits
+from rflx.pyrflx.decoder import DecodedField, Decoder, LiteralTable, field_bits, round_trips
+
+InitialMessages = Dict[Tuple[int, int], Tuple[Optional[Sequence[Refinement]], "MessageValue"]]
 
 
 class NotInitializedError(Exception):
@@ -41,13 +45,23 @@ class NotInitializedError(Exception):
 
 class TypeValue(ABC):
 
-    _value: Any = None
+    __slots__ = ("_type", "_value")
+
+    _value: Any
 
     def __init__(self, vtype: Type) -> None:
         self._type = vtype
+        self._value = None
 
     def __repr__(self) -> str:
-        return generic_repr(self.__class__.__name__, self.__dict__)
+        return generic_repr(self.__class__.__name__, slot_values(self))
+
+    def __copy__(self) -> "TypeValue":
+        result = self.__class__.__new__(self.__class__)
+        for name in slot_names(self.__class__):
+            if hasattr(self, name):
+                setattr(result, name, getattr(self, name))
+        return result
 
     def __eq__(self, other: object) -> bool:
         if isinstance(other, self.__class__):
@@ -125,6 +139,8 @@ class TypeValue(ABC):
 
 class ScalarValue(TypeValue):
 
+    __slots__ = ()
+
     _type: Scalar
 
     def __init__(self, vtype: Scalar) -> None:
@@ -144,6 +160,8 @@ class ScalarValue(TypeValue):
 
 class IntegerValue(ScalarValue):
 
+    __slots__ = ()
+
     _value: int
     _type: Integer
 
@@ -192,7 +210,7 @@ class IntegerValue(ScalarValue):
     @property
     def bitstring(self) -> Bitstring:
         self._raise_initialized()
-        return Bitstring(format(self._value, f"0{self.size}b"))
+        return Bitstring.from_int(self._value, self.size.value)
 
     @property
     def accepted_type(self) -> type:
@@ -201,43 +219,22 @@ class IntegerValue(ScalarValue):
 
 class EnumValue(ScalarValue):
 
+    __slots__ = ("_literals",)
+
     _value: Tuple[str, Number]
     _type: Enumeration
 
-    def __init__(self, vtype: Enumeration) -> None:
+    def __init__(self, vtype: Enumeration, literals: LiteralTable = None) -> None:
         super().__init__(vtype)
+        self._literals = literals or LiteralTable(vtype)
 
     def assign(self, value: str, check: bool = True) -> None:
-        if value not in self._type.literals:
-            raise KeyError(f"{value} is not a valid enum value")
-        r = (
-            And(*self._type.constraints("__VALUE__", check))
-            .substituted(
-                mapping={
-                    **{Variable(k): v for k, v in self._type.literals.items()},
-                    **{Variable("__VALUE__"): self._type.literals[value]},
-                    **{Length("__VALUE__"): self._type.size},
-                }
-            )
-            .simplified()
-        )
-        assert r == TRUE
-        self._value = value, self._type.literals[value]
+        self._value = self._literals.by_name(value)
 
     def parse(self, value: Union[Bitstring, bytes]) -> None:
         if isinstance(value, bytes):
             value = Bitstring.from_bytes(value)
-        value_as_number = Number(int(value))
-        if value_as_number not in self.literals.values():
-            if self._type.always_valid:
-                self._value = "UNKNOWN", value_as_number
-            else:
-                raise KeyError(f"Number {value_as_number.value} is not a valid enum value")
-        else:
-            for k, v in self.literals.items():
-                if v == value_as_number:
-                    assert isinstance(v, Number)
-                    self._value = str(k), v
+        self._value = self._literals.by_value(int(value))
 
     @property
     def value(self) -> str:
@@ -252,7 +249,7 @@ class EnumValue(ScalarValue):
     @property
     def bitstring(self) -> Bitstring:
         self._raise_initialized()
-        return Bitstring(format(self._value[1].value, f"0{self.size}b"))
+        return Bitstring.from_int(self._value[1].value, self.size.value)
 
     @property
     def accepted_type(self) -> type:
@@ -264,13 +261,25 @@ class EnumValue(ScalarValue):
 
 
 class CompositeValue(TypeValue):
+
+    __slots__ = ("_expected_size",)
+
     def __init__(self, vtype: Composite) -> None:
         self._expected_size: Optional[Expr] = None
         super().__init__(vtype)
 
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, self.__class__):
+            return super().__eq__(other) and self._expected_size == other._expected_size
+        return NotImplemented
+
     def set_expected_size(self, expected_size: Expr) -> None:
         self._expected_size = expected_size
 
+    @abstractmethod
+    def parse(self, value: Union[Bitstring, bytes], lazy: bool = False) -> None:
+        raise NotImplementedError
+
     def _check_length_of_assigned_value(
         self, value: Union[bytes, Bitstring, List[TypeValue]]
     ) -> None:
@@ -300,33 +309,73 @@ class CompositeValue(TypeValue):
 
 class OpaqueValue(CompositeValue):
 
-    _value: bytes
-    _nested_message: Optional["MessageValue"] = None
+    __slots__ = (
+        "_refinement_message",
+        "_all_refinements",
+        "_nested_message",
+        "_initial_messages",
+    )
+
+    _value: Union[bytes, memoryview]
 
     def __init__(self, vtype: Opaque) -> None:
         super().__init__(vtype)
+        self._nested_message: Optional["MessageValue"] = None
         self._refinement_message: Optional[Message] = None
         self._all_refinements: Sequence[Refinement] = []
+        self._initial_messages: InitialMessages = {}
+
+    def __getstate__(self) -> Tuple[None, Dict[str, Any]]:
+        state = {**slot_values(self), "_initial_messages": {}}
+        if isinstance(self._value, memoryview):
+            state["_value"] = bytes(self._value)
+        return None, state
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, self.__class__):
+            if not super().__eq__(other) or self._refinement_message != other._refinement_message:
+                return False
+            if self._value is None:
+                return self._nested_message == other._nested_message
+            # Nested messages of lazily parsed values are parsed for the comparison
+            return self.nested_message == other.nested_message
+        return NotImplemented
 
     def assign(self, value: bytes, check: bool = True) -> None:
-        self.parse(value)
+        self.parse(bytes(value))
 
-    def parse(self, value: Union[Bitstring, bytes]) -> None:
+    def parse(self, value: Union[Bitstring, bytes], lazy: bool = False) -> None:
+        """
+        Parse the value.
+
+        The value of a parsed bitstring refers to the buffer of the bitstring, as long as the
+        bitstring is byte-aligned. An assigned value is always copied.
+        """
         self._check_length_of_assigned_value(value)
-        if self._refinement_message is not None:
-            nested_msg = MessageValue(self._refinement_message, self._all_refinements)
-            try:
-                nested_msg.parse(value)
-            except (IndexError, ValueError, KeyError) as e:
-                raise ValueError(
-                    f"Error while parsing nested message "
-                    f"{self._refinement_message.identifier}: {e}"
-                )
-            assert nested_msg.valid_message
-            self._nested_message = nested_msg
-            self._value = nested_msg.bytestring
+        self._nested_message = None
+        if self._refinement_message is not None and not lazy:
+            self._nested_message = self.__parse_nested_message(value, lazy)
+            parsed = self._nested_message._parsed
+            if isinstance(value, Bitstring) and parsed is not None and len(parsed) == len(value):
+                self._value = value.view()
+            else:
+                self._value = self._nested_message.bytestring
         else:
-            self._value = bytes(value)
+            self._value = value.view() if isinstance(value, Bitstring) else bytes(value)
+
+    def __parse_nested_message(self, value: Union[Bitstring, bytes], lazy: bool) -> "MessageValue":
+        assert self._refinement_message is not None
+        nested_msg = new_message(
+            self._initial_messages, self._refinement_message, self._all_refinements
+        )
+        try:
+            nested_msg.parse(value, lazy)
+        except (IndexError, ValueError, KeyError) as e:
+            raise ValueError(
+                f"Error while parsing nested message {self._refinement_message.identifier}: {e}"
+            )
+        assert nested_msg.valid_message
+        return nested_msg
 
     def set_refinement(
         self, model_of_refinement_msg: Message, all_refinements: Sequence[Refinement]
@@ -343,17 +392,21 @@ class OpaqueValue(CompositeValue):
     @property
     def nested_message(self) -> Optional["MessageValue"]:
         self._raise_initialized()
+        if self._nested_message is None and self._refinement_message is not None:
+            self._nested_message = self.__parse_nested_message(self.bitstring, True)
         return self._nested_message
 
     @property
     def value(self) -> bytes:
         self._raise_initialized()
+        if isinstance(self._value, memoryview):
+            self._value = bytes(self._value)
         return self._value
 
     @property
     def bitstring(self) -> Bitstring:
         self._raise_initialized()
-        return Bitstring(format(int.from_bytes(self._value, "big"), f"0{self.size}b"))
+        return Bitstring.from_bytes(self._value)
 
     @property
     def accepted_type(self) -> type:
@@ -362,6 +415,15 @@ class OpaqueValue(CompositeValue):
 
 class ArrayValue(CompositeValue):
 
+    __slots__ = (
+        "_element_type",
+        "_is_message_array",
+        "_pending",
+        "_packed",
+        "_initial_messages",
+        "_element_literals",
+    )
+
     _value: List[TypeValue]
 
     def __init__(self, vtype: Array) -> None:
@@ -369,6 +431,23 @@ class ArrayValue(CompositeValue):
         self._element_type = vtype.element_type
         self._is_message_array = isinstance(self._element_type, Message)
         self._value = []
+        self._pending: Optional[Bitstring] = None
+        self._packed: Optional[Tuple[Sequence[int], Bitstring]] = None
+        self._initial_messages: InitialMessages = {}
+        self._element_literals = (
+            LiteralTable(self._element_type)
+            if isinstance(self._element_type, Enumeration)
+            else None
+        )
+
+    def __getstate__(self) -> Tuple[None, Dict[str, Any]]:
+        return None, {**slot_values(self), "_initial_messages": {}}
+
+    def __eq__(self, other: object) -> bool:
+        self.__unpack()
+        if isinstance(other, ArrayValue):
+            other.__unpack()
+        return super().__eq__(other)
 
     def assign(self, value: List[TypeValue], check: bool = True) -> None:
         self._check_length_of_assigned_value(value)
@@ -397,17 +476,31 @@ class ArrayValue(CompositeValue):
                         f"{type(self._element_type).__name__}"
                     )
 
+        self._pending = None
+        self._packed = None
         self._value = value
 
-    def parse(self, value: Union[Bitstring, bytes]) -> None:
+    def parse(self, value: Union[Bitstring, bytes], lazy: bool = False) -> None:
         self._check_length_of_assigned_value(value)
         if isinstance(value, bytes):
             value = Bitstring.from_bytes(value)
+        if (
+            lazy
+            and len(value) > 0
+            and (
+                self._is_message_array
+                or isinstance(self._element_type, Scalar)
+                and len(value) % self.__element_size == 0
+            )
+        ):
+            self._pending = value
+            return
         if self._is_message_array:
+            messages: List[TypeValue] = []
 
             while len(value) != 0:
-                nested_message = TypeValue.construct(self._element_type)
-                assert isinstance(nested_message, MessageValue)
+                assert isinstance(self._element_type, Message)
+                nested_message = new_message(self._initial_messages, self._element_type)
                 try:
                     nested_message.parse(value)
                 except (IndexError, ValueError, KeyError) as e:
@@ -416,28 +509,99 @@ class ArrayValue(CompositeValue):
                         f"{self._element_type.full_name}: {e}"
                     )
                 assert nested_message.valid_message
-                self._value.append(nested_message)
+                messages.append(nested_message)
                 value = value[len(nested_message.bitstring) :]
 
+            self._pending = None
+            self._packed = None
+            self._value = messages
+
         elif isinstance(self._element_type, Scalar):
-            value_str = str(value)
-            type_size = self._element_type.size
-            assert isinstance(type_size, Number)
-            type_size_int = type_size.value
+            type_size_int = self.__element_size
+
+            if len(value) > 0 and len(value) % type_size_int == 0:
+                elements = value.unpack(type_size_int)
+                self.__check_elements(elements)
+                self._pending = None
+                self._packed = (elements, value)
+                self._value = []
+                return
+
             new_value = []
 
-            while len(value_str) != 0:
+            for i in range(0, len(value), type_size_int):
                 nested_value = TypeValue.construct(self._element_type)
-                nested_value.parse(Bitstring(value_str[:type_size_int]))
+                nested_value.parse(value[i : min(i + type_size_int, len(value))])
                 new_value.append(nested_value)
-                value_str = value_str[type_size_int:]
 
+            self._pending = None
+            self._packed = None
             self._value = new_value
         else:
             raise NotImplementedError(f"Arrays of {self._element_type} currently not supported")
 
+    def clear(self) -> None:
+        self._pending = None
+        self._packed = None
+        super().clear()
+
+    @property
+    def __element_size(self) -> int:
+        assert isinstance(self._element_type, Scalar)
+        size = self._element_type.size
+        assert isinstance(size, Number)
+        return size.value
+
+    def __check_elements(self, elements: Sequence[int]) -> None:
+        if isinstance(self._element_type, Integer):
+            first = self._element_type.first.simplified()
+            last = self._element_type.last.simplified()
+            assert isinstance(first, Number) and isinstance(last, Number)
+            if min(elements) < first.value or max(elements) > last.value:
+                value = next(e for e in elements if not first.value <= e <= last.value)
+                raise ValueError(f"value {value} not in type range {first.value} .. {last.value}")
+
+        if isinstance(self._element_type, Enumeration) and not self._element_type.always_valid:
+            literals = self._element_literals
+            assert literals
+            if not literals.values.keys() >= set(elements):
+                literals.by_value(next(e for e in elements if e not in literals.values))
+
+    def __unpack(self) -> None:
+        """Create the element values of a parsed array of scalars."""
+        self.__parse_pending()
+        if self._packed is None:
+            return
+
+        values: List[TypeValue] = []
+
+        if isinstance(self._element_type, Integer):
+            for e in self._packed[0]:
+                integer = IntegerValue(self._element_type)
+                integer._value = e
+                values.append(integer)
+
+        if isinstance(self._element_type, Enumeration):
+            literals = self._element_literals
+            assert literals
+            for e in self._packed[0]:
+                enum = EnumValue(self._element_type, literals)
+                enum._value = literals.by_value(e)
+                values.append(enum)
+
+        self._packed = None
+        self._value = values
+
+    def __parse_pending(self) -> None:
+        if self._pending is not None:
+            self.parse(self._pending)
+
     @property
     def size(self) -> Expr:
+        if self._pending is not None:
+            return Number(len(self._pending))
+        if self._packed is not None:
+            return Number(len(self._packed[1]))
         if not self._value:
             return self._expected_size if self._expected_size is not None else UNDEFINED
         return Number(len(self.bitstring))
@@ -445,11 +609,16 @@ class ArrayValue(CompositeValue):
     @property
     def value(self) -> Sequence[TypeValue]:
         self._raise_initialized()
+        self.__unpack()
         return self._value
 
     @property
     def bitstring(self) -> Bitstring:
         self._raise_initialized()
+        if self._pending is not None:
+            return self._pending
+        if self._packed is not None:
+            return self._packed[1]
         bits = [element.bitstring for element in self._value]
         return Bitstring.join(bits)
 
@@ -460,34 +629,125 @@ class ArrayValue(CompositeValue):
 
 class MessageValue(TypeValue):
 
+    __slots__ = (
+        "_refinements",
+        "__field_refinements",
+        "__type_literals",
+        "__expressions",
+        "__dependent_expressions",
+        "_fields",
+        "_last_field",
+        "_simplified_mapping",
+        "__simplified_expressions",
+        "__changed_fields",
+        "__valid_fields",
+        "accessible_fields",
+        "_parsed",
+        "__prototype",
+        "__decoder",
+    )
+
     _type: Message
 
     def __init__(self, model: Message, refinements: Sequence[Refinement] = None) -> None:
         super().__init__(model)
+        self.__prototype: Tuple[
+            Dict[str, MessageValue.Field], str, Dict[Name, Expr], Dict[int, Expr], List[str]
+        ] = ({}, "", {}, {}, [])
+        self.__decoder: List[Decoder] = []
         self._refinements = refinements or []
+        self.__field_refinements: Dict[str, List[Refinement]] = {}
+        for r in self._refinements:
+            if r.pdu.name == self.name:
+                self.__field_refinements.setdefault(r.field.name, []).append(r)
+        self.__type_literals: Mapping[Name, Expr] = {
+            Variable(k): v
+            for t in self._type.types.values()
+            if isinstance(t, Enumeration)
+            for k, v in t.literals.items()
+        }
+        self.__expressions: Dict[int, Expr] = {
+            id(e): e
+            for e in [
+                *[e for l in self._type.structure for e in [l.condition, l.length, l.first]],
+                *[self._type.field_condition(f) for f in self._type.fields],
+            ]
+        }
+        self.__dependent_expressions: Dict[str, List[int]] = {}
+        for k, e in self.__expressions.items():
+            for v in e.variables():
+                self.__dependent_expressions.setdefault(str(v.name), []).append(k)
+        initial = self.Field(OpaqueValue(Opaque()), Number(0))
+        initial.typeval.assign(bytes())
         self._fields: Dict[str, MessageValue.Field] = {
-            f.name: self.Field(TypeValue.construct(self._type.types[f])) for f in self._type.fields
+            **{
+                f.name: self.Field(TypeValue.construct(self._type.types[f]))
+                for f in self._type.fields
+            },
+            INITIAL.name: initial,
         }
-        self.__type_literals: Mapping[Name, Expr] = {}
+        self._simplified_mapping: Dict[Name, Expr] = {}
+        self.__simplified_expressions: Dict[int, Expr] = {}
+        self.__changed_fields: List[str] = []
+        self.__valid_fields: Optional[List[str]] = None
         self._last_field: str = self._next_field(INITIAL.name)
-        for t in [
-            f.typeval.literals for f in self._fields.values() if isinstance(f.typeval, EnumValue)
-        ]:
-            self.__type_literals = {**self.__type_literals, **t}
-        initial = self.Field(OpaqueValue(Opaque()))
-        initial.first = Number(0)
-        initial.typeval.assign(bytes())
-        self._fields[INITIAL.name] = initial
-        self._simplified_mapping: Mapping[Name, Expr] = {}
         self._preset_fields(INITIAL.name)
         self.accessible_fields: List[str]
         self._update_accessible_fields()
+        self._parsed: Optional[Bitstring] = None
+        self.__update_simplified_mapping()
+        self.__prototype = (
+            self.__copied_fields(self._fields),
+            self._last_field,
+            self._simplified_mapping,
+            self.__simplified_expressions,
+            list(self.accessible_fields),
+        )
 
     def __copy__(self) -> "MessageValue":
-        return MessageValue(self._type, self._refinements)
+        """Return a new message, which is created from the initial state of this message."""
+        message = MessageValue.__new__(MessageValue)
+        message._type = self._type
+        message._value = None
+        message._refinements = self._refinements
+        message.__field_refinements = self.__field_refinements
+        message.__type_literals = self.__type_literals
+        message.__expressions = self.__expressions
+        message.__dependent_expressions = self.__dependent_expressions
+        message.__prototype = self.__prototype
+        message.__decoder = self.__decoder
+        message.__reset()
+        return message
+
+    def __getstate__(self) -> Tuple[None, Dict[str, Any]]:
+        return None, {**slot_values(self), "_MessageValue__decoder": []}
 
-    def __repr__(self) -> str:
-        return generic_repr(self.__class__.__name__, self.__dict__)
+    @property
+    def __plan(self) -> Decoder:
+        """Return the decoding plan, which is created once and shared by all copies."""
+        if not self.__decoder:
+            self.__decoder.append(Decoder(self._type, self._refinements))
+        return self.__decoder[0]
+
+    def __reset(self) -> None:
+        (
+            fields,
+            self._last_field,
+            self._simplified_mapping,
+            self.__simplified_expressions,
+            accessible_fields,
+        ) = self.__prototype
+        self._fields = self.__copied_fields(fields)
+        self.__changed_fields = []
+        self.__valid_fields = None
+        self.accessible_fields = list(accessible_fields)
+        self._parsed = None
+
+    @staticmethod
+    def __copied_fields(
+        fields: Mapping[str, "MessageValue.Field"]
+    ) -> Dict[str, "MessageValue.Field"]:
+        return {k: MessageValue.Field(copy(v.typeval), v.first) for k, v in fields.items()}
 
     def __eq__(self, other: object) -> bool:
         if isinstance(other, self.__class__):
@@ -557,7 +817,11 @@ class MessageValue(TypeValue):
                 return self.__simplified(l.first)
         prv = self._prev_field(fld)
         if prv:
-            return self.__simplified(Add(self._fields[prv].first, self._fields[prv].typeval.size))
+            first = self._fields[prv].first
+            size = self._fields[prv].typeval.size
+            if isinstance(first, Number) and isinstance(size, Number):
+                return Number(first.value + size.value)
+            return self.__simplified(Add(first, size))
         return UNDEFINED
 
     def _has_first(self, fld: str) -> bool:
@@ -579,9 +843,82 @@ class MessageValue(TypeValue):
     def assign(self, value: bytes, check: bool = True) -> None:
         raise NotImplementedError
 
-    def parse(self, value: Union[Bitstring, bytes]) -> None:
-        if isinstance(value, bytes):
+    def parse(self, value: Union[Bitstring, bytes], lazy: bool = False) -> None:
+        """
+        Parse the message.
+
+        In lazy mode, arrays and refined payloads are parsed not until they are accessed. Errors
+        in these fields are reported by the access instead of by the parsing of the message.
+
+        The parsed bitstring is kept until the message is changed, so that an unchanged message
+        is not serialized again. This is only done if all fields are serialized to the same bits
+        from which they were parsed.
+        """
+        if not isinstance(value, Bitstring):
             value = Bitstring.from_bytes(value)
+        decoded = self.__plan.decode(value)
+        if decoded is None or not self.__set_decoded_fields(decoded, lazy):
+            self.__reset()
+            self.__parse_fields(value)
+        else:
+            self._parsed = (
+                value[: decoded[-1].first + decoded[-1].length]
+                if decoded
+                and all(
+                    round_trips(value, f.first, f.length)
+                    and self.__parsed_unchanged(self._fields[f.name].typeval)
+                    for f in decoded
+                )
+                else None
+            )
+
+    @staticmethod
+    def __parsed_unchanged(typeval: TypeValue) -> bool:
+        """Return True if the parsed nested messages of a field are serialized unchanged."""
+        if isinstance(typeval, OpaqueValue) and typeval._nested_message is not None:
+            return typeval._nested_message._parsed is not None
+        if isinstance(typeval, ArrayValue) and typeval._is_message_array:
+            return all(
+                isinstance(m, MessageValue) and m._parsed is not None for m in typeval._value
+            )
+        return True
+
+    def __set_decoded_fields(self, decoded: Sequence[DecodedField], lazy: bool) -> bool:
+        fields = self.__copied_fields(self.__prototype[0])
+
+        for d in decoded:
+            field = fields[d.name]
+            field.first = Number(d.first)
+            typeval = field.typeval
+            if isinstance(typeval, IntegerValue):
+                assert isinstance(d.value, int)
+                typeval._value = d.value
+            elif isinstance(typeval, EnumValue):
+                assert isinstance(d.value, tuple)
+                typeval._value = d.value
+            else:
+                assert isinstance(typeval, CompositeValue) and isinstance(d.value, Bitstring)
+                if d.sized:
+                    typeval.set_expected_size(Number(d.length))
+                if isinstance(typeval, OpaqueValue) and d.refinement:
+                    typeval.set_refinement(d.refinement, self._refinements)
+                try:
+                    typeval.parse(d.value, lazy)
+                except (IndexError, KeyError, NotImplementedError, TypeError, ValueError):
+                    return False
+                if typeval.size != Number(d.length):
+                    return False
+
+        self._fields = fields
+        self._simplified_mapping = {}
+        self.__changed_fields = []
+        if decoded:
+            self._last_field = decoded[-1].name
+        self.accessible_fields = [d.name for d in decoded]
+        self.__valid_fields = list(self.accessible_fields)
+        return True
+
+    def __parse_fields(self, value: Bitstring) -> None:
         current_field_name = self._next_field(INITIAL.name)
         last_field_first_in_bitstr = current_field_first_in_bitstr = 0
         current_field_length = 0
@@ -609,28 +946,11 @@ class MessageValue(TypeValue):
             return last_pos_in_bitstr, current_pos_in_bitstring
 
         def set_field_with_length(field_name: str, field_length: int) -> Tuple[int, int]:
-            assert isinstance(value, Bitstring)
             last_pos_in_bitstr = current_pos_in_bitstring = get_current_pos_in_bitstr(field_name)
-            if field_length < 8 or field_length % 8 == 0:
-                self.set(
-                    field_name,
-                    value[current_pos_in_bitstring : current_pos_in_bitstring + field_length],
-                )
-                current_pos_in_bitstring += field_length
-            else:
-                bytes_used_for_field = field_length // 8 + 1
-                first_pos = current_pos_in_bitstring
-                field_bits = Bitstring()
-
-                for _ in range(bytes_used_for_field - 1):
-                    field_bits += value[current_pos_in_bitstring : current_pos_in_bitstring + 8]
-                    current_pos_in_bitstring += 8
-
-                k = field_length // bytes_used_for_field + 1
-                field_bits += value[current_pos_in_bitstring + 8 - k : first_pos + field_length]
-                current_pos_in_bitstring = first_pos + field_length
-                self.set(field_name, field_bits)
-            return last_pos_in_bitstr, current_pos_in_bitstring
+            if current_pos_in_bitstring + field_length > len(value):
+                raise IndexError
+            self.set(field_name, field_bits(value, current_pos_in_bitstring, field_length))
+            return last_pos_in_bitstr, current_pos_in_bitstring + field_length
 
         while current_field_name != FINAL.name:
             current_field = self._fields[current_field_name]
@@ -662,15 +982,14 @@ class MessageValue(TypeValue):
     ) -> None:
         def set_refinement(fld: MessageValue.Field, fld_name: str) -> None:
             if isinstance(fld.typeval, OpaqueValue):
-                for ref in self._refinements:
-                    if (
-                        ref.pdu.name == self.name
-                        and ref.field.name == fld_name
-                        and self._valid_refinement_condition(ref)
-                    ):
+                for ref in self.__field_refinements.get(fld_name, []):
+                    if self._valid_refinement_condition(ref):
                         fld.typeval.set_refinement(ref.sdu, self._refinements)
 
         if field_name in self.accessible_fields:
+            self._parsed = None
+            self.__valid_fields = None
+            self.__changed_fields.append(field_name)
             field = self._fields[field_name]
             field.first = self._get_first(field_name)
             if isinstance(field.typeval, CompositeValue) and self._has_length(field_name):
@@ -700,6 +1019,7 @@ class MessageValue(TypeValue):
             ]
         ):
             self._fields[field_name].typeval.clear()
+            self.__changed_fields.append(field_name)
             if isinstance(value, bytes):
                 value_repr = "x" + value.hex()
             else:
@@ -722,6 +1042,7 @@ class MessageValue(TypeValue):
                 break
 
             field.first = self._get_first(nxt)
+            self.__changed_fields.append(nxt)
             if isinstance(field.typeval, OpaqueValue):
                 field.typeval.set_expected_size(self._get_length(nxt))
 
@@ -743,20 +1064,11 @@ class MessageValue(TypeValue):
 
     @property
     def bitstring(self) -> Bitstring:
-        bits = ""
-        field = self._next_field(INITIAL.name)
-        while field and field != FINAL.name:
-            field_val = self._fields[field]
-            if (
-                not field_val.set
-                or not isinstance(field_val.first, Number)
-                or not field_val.first.value <= len(bits)
-            ):
-                break
-            bits = bits[: field_val.first.value] + str(self._fields[field].typeval.bitstring)
-            field = self._next_field(field)
-
-        return Bitstring(bits)
+        if self._parsed is not None:
+            return self._parsed
+        buffer = bytearray()
+        length = self.__write(buffer)
+        return Bitstring.from_bytes(bytes(buffer))[:length]
 
     @property
     def value(self) -> Any:
@@ -764,13 +1076,91 @@ class MessageValue(TypeValue):
 
     @property
     def bytestring(self) -> bytes:
-        bits = str(self.bitstring)
-        if len(bits) < 8:
-            bits = bits.ljust(8, "0")
+        return self.__serialize(bytearray())
+
+    @staticmethod
+    def serialize_many(messages: Iterable["MessageValue"]) -> List[bytes]:
+        """Serialize messages into one buffer, which is reused for all messages."""
+        buffer = bytearray()
+        return [m.__serialize(buffer) for m in messages]
+
+    def __serialize(self, buffer: bytearray) -> bytes:
+        if self._parsed is not None and len(self._parsed) >= 8:
+            return bytes(self._parsed)
+        length = self.__write(buffer)
+        if length < 8:
+            return bytes([buffer[0] & (0xFF00 >> length) & 0xFF if buffer else 0])
+        result = bytes(buffer[: length // 8])
+        if length % 8:
+            result += bytes([buffer[length // 8] >> (8 - length % 8)])
+        return result
+
+    def __write(self, buffer: bytearray) -> int:
+        """
+        Write the fields into the buffer and return the length of the message in bits.
+
+        The buffer is extended if it is too small. Bits behind the end of the message are
+        undefined, so that the same buffer can be used for successive messages.
+        """
+        layout = self.__layout()
+        end = max((first + length for first, length, _ in layout), default=0)
+        if len(buffer) * 8 < end:
+            buffer.extend(bytes(-(-end // 8) - len(buffer)))
+        for first, length, data in layout:
+            write_bits(buffer, first, length, data)
+        return layout[-1][0] + layout[-1][1] if layout else 0
+
+    def __layout(self) -> List[Tuple[int, int, Union[int, bytes, memoryview]]]:
+        """
+        Return position, length and value of all fields on the path through the message.
+
+        Each field is placed at its first position, which must not be behind the end of the
+        preceding field. All bits behind a field are overwritten by the subsequent fields.
+        """
+        values: Dict[str, int] = {}
+        firsts: Dict[str, int] = {}
+        lengths: Dict[str, int] = {}
+
+        for k, v in self._fields.items():
+            if not v.set:
+                continue
+            assert isinstance(v.first, Number) and isinstance(v.typeval.size, Number)
+            firsts[k] = v.first.value
+            lengths[k] = v.typeval.size.value
+            if isinstance(v.typeval, IntegerValue):
+                values[k] = v.typeval.value
+            elif isinstance(v.typeval, EnumValue) and v.typeval.value in v.typeval._type.literals:
+                values[k] = v.typeval._value[1].value
+
+        plan = self.__plan
+        layout: List[Tuple[int, int, Union[int, bytes, memoryview]]] = []
+        end = 0
+        name: Optional[str] = plan.next_field(INITIAL.name, values, firsts, lengths)
+
+        while name and name != FINAL.name:
+            if name not in firsts or firsts[name] > end:
+                break
+            typeval = self._fields[name].typeval
+            data: Union[int, bytes, memoryview]
+            if isinstance(typeval, IntegerValue):
+                data = typeval.value
+                length = max(lengths[name], data.bit_length())
+            elif isinstance(typeval, EnumValue):
+                data = typeval._value[1].value
+                length = max(lengths[name], data.bit_length())
+            elif isinstance(typeval, OpaqueValue):
+                typeval._raise_initialized()
+                data = typeval._value
+                length = len(data) * 8
+            else:
+                bits = typeval.bitstring
+                length = len(bits)
+                data = bytes(bits) if length % 8 == 0 else int(bits)
+            layout.append((firsts[name], length, data))
+            end = firsts[name] + length
+            name = plan.next_field(name, values, firsts, lengths)
 
-        return b"".join(
-            [int(bits[i : i + 8], 2).to_bytes(1, "big") for i in range(0, len(bits), 8)]
-        )
+        return layout
 
     @property
     def fields(self) -> List[str]:
@@ -816,57 +1206,103 @@ class MessageValue(TypeValue):
 
     @property
     def valid_fields(self) -> List[str]:
-        return [
-            f
-            for f in self.accessible_fields
-            if (
-                self._fields[f].set
-                and self.__simplified(self._type.field_condition(Field(f))) == TRUE
-                and any(
-                    [self.__simplified(i.condition) == TRUE for i in self._type.incoming(Field(f))]
-                )
-                and any(
-                    [self.__simplified(o.condition) == TRUE for o in self._type.outgoing(Field(f))]
+        if self.__valid_fields is None:
+            self.__valid_fields = [
+                f
+                for f in self.accessible_fields
+                if (
+                    self._fields[f].set
+                    and self.__simplified(self._type.field_condition(Field(f))) == TRUE
+                    and any(
+                        self.__simplified(i.condition) == TRUE
+                        for i in self._type.incoming(Field(f))
+                    )
+                    and any(
+                        self.__simplified(o.condition) == TRUE
+                        for o in self._type.outgoing(Field(f))
+                    )
                 )
-            )
-        ]
+            ]
+        return list(self.__valid_fields)
 
     @property
     def required_fields(self) -> List[str]:
-        accessible = self.accessible_fields
-        valid = self.valid_fields
-        return [f for f in accessible if f not in valid]
+        valid = set(self.valid_fields)
+        return [f for f in self.accessible_fields if f not in valid]
 
     @property
     def valid_message(self) -> bool:
         return bool(self.valid_fields) and self._next_field(self.valid_fields[-1]) == FINAL.name
 
     def __update_simplified_mapping(self) -> None:
-        field_values: Mapping[Name, Expr] = {
-            **{
-                Variable(k): v.typeval.expr
-                for k, v in self._fields.items()
-                if isinstance(v.typeval, ScalarValue) and v.set
-            },
-            **{Length(k): v.typeval.size for k, v in self._fields.items() if v.set},
-            **{First(k): v.first for k, v in self._fields.items() if v.set},
-            **{Last(k): v.last for k, v in self._fields.items() if v.set},
-        }
-        self._simplified_mapping = {**field_values, **self.__type_literals}
+        """
+        Update the values of all changed fields in the mapping used for simplifications.
+
+        The simplified expressions of the message model, which depend on a changed field, are
+        removed from the cache. All fields are considered as changed, if the mapping is empty. The
+        mapping and the cache of the initial state are shared by all copies of a message until the
+        first change.
+        """
+        if not self._simplified_mapping:
+            self._simplified_mapping = dict(self.__type_literals)
+            self.__simplified_expressions = {}
+            self.__changed_fields = list(self._fields)
+        elif not self.__changed_fields:
+            return
+        elif self._simplified_mapping is self.__prototype[2]:
+            self._simplified_mapping = dict(self._simplified_mapping)
+            self.__simplified_expressions = dict(self.__simplified_expressions)
+
+        for k in unique(self.__changed_fields):
+            v = self._fields[k]
+            for name in [Variable(k), Length(k), First(k), Last(k)]:
+                if name not in self.__type_literals:
+                    self._simplified_mapping.pop(name, None)
+            if v.set:
+                field_values: Dict[Name, Expr] = {
+                    Length(k): v.typeval.size,
+                    First(k): v.first,
+                    Last(k): v.last,
+                }
+                if isinstance(v.typeval, ScalarValue):
+                    field_values[Variable(k)] = v.typeval.expr
+                for name, value in field_values.items():
+                    self._simplified_mapping.setdefault(name, value)
+            for e in self.__dependent_expressions.get(k, []):
+                self.__simplified_expressions.pop(e, None)
+
+        self.__changed_fields = []
 
     def __simplified(self, expr: Expr) -> Expr:
+        """
+        Return the expression simplified by the current values of all fields.
+
+        Simplified expressions of the message model are cached until a field they depend on is
+        changed.
+        """
         if not self._simplified_mapping:
             self.__update_simplified_mapping()
-        return (
+        key = id(expr)
+        if key in self.__simplified_expressions:
+            return self.__simplified_expressions[key]
+        result = (
             expr.substituted(mapping=self._simplified_mapping)
             .substituted(mapping=self._simplified_mapping)
             .simplified()
         )
+        if key in self.__expressions:
+            if self.__simplified_expressions is self.__prototype[3]:
+                self.__simplified_expressions = dict(self.__simplified_expressions)
+            self.__simplified_expressions[key] = result
+        return result
 
     class Field:
-        def __init__(self, t: TypeValue):
+
+        __slots__ = ("typeval", "first")
+
+        def __init__(self, t: TypeValue, first: Expr = UNDEFINED):
             self.typeval = t
-            self.first: Expr = UNDEFINED
+            self.first = first
 
         def __eq__(self, other: object) -> bool:
             if isinstance(other, MessageValue.Field):
@@ -878,7 +1314,7 @@ class MessageValue(TypeValue):
             return NotImplemented
 
         def __repr__(self) -> str:
-            return generic_repr(self.__class__.__name__, self.__dict__)
+            return generic_repr(self.__class__.__name__, slot_values(self))
 
         @property
         def set(self) -> bool:
@@ -886,9 +1322,26 @@ class MessageValue(TypeValue):
                 self.typeval.initialized
                 and isinstance(self.typeval.size, Number)
                 and isinstance(self.first, Number)
-                and isinstance(self.last, Number)
             )
 
         @property
         def last(self) -> Expr:
             return Sub(Add(self.first, self.typeval.size), Number(1)).simplified()
+
+
+def new_message(
+    initial_messages: InitialMessages, model: Message, refinements: Sequence[Refinement] = None,
+) -> MessageValue:
+    """
+    Return a new message.
+
+    The message is copied from an initial message, which is created only once for each message
+    and list of refinements and stored in the given dictionary. The dictionary belongs to the
+    value containing the message and is shared by its copies, so that the initial messages are
+    released together with these values. Each entry keeps references to the message and the
+    refinements, so that their identities stay valid.
+    """
+    key = (id(model), id(refinements))
+    if key not in initial_messages:
+        initial_messages[key] = (refinements, MessageValue(model, refinements))
+    return copy(initial_messages[key][1])
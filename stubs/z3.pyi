@@ -6,6 +6,7 @@ class Context: ...
 class ExprRef:
     def __eq__(self, other: "ExprRef") -> "BoolRef": ...  # type: ignore
     def __ne__(self, other: "ExprRef") -> "BoolRef": ...  # type: ignore
+    def sexpr(self) -> str: ...
 
 class BoolRef(ExprRef): ...
 
@@ -33,6 +34,7 @@ def If(c: BoolRef, t: ExprRef, e: ExprRef, ctx: Optional[Context] = None) -> Exp
 def ForAll(v: Iterable[ExprRef], cond: ExprRef) -> ExprRef: ...
 def Exists(v: Iterable[ExprRef], cond: ExprRef) -> ExprRef: ...
 def simplify(e: ExprRef) -> ExprRef: ...
+def get_version_string() -> str: ...
 
 class CheckSatResult: ...
 
@@ -46,3 +48,5 @@ class Solver:
     def assert_and_track(self, expr: ExprRef, name: str) -> None: ...
     def unsat_core(self) -> Iterable[ExprRef]: ...
     def set(self, unsat_core: bool) -> None: ...
+    def push(self) -> None: ...
+    def pop(self, num: int = 1) -> None: ...
@@ -4,8 +4,10 @@ from typing import Any
 import pkg_resources
 import pytest
 
-from rflx import cli
+from rflx import cli, expression
+from rflx.expression import set_proof_cache
 from rflx.model import ModelError
+from rflx.parser import parser, set_parser_cache
 
 
 def raise_model_error() -> None:
@@ -34,6 +36,42 @@ def test_main_check_quiet() -> None:
     assert cli.main(["rflx", "--quiet", "check", "specs/tlv.rflx"]) == 0
 
 
+def test_main_check_workers() -> None:
+    assert cli.main(["rflx", "-j", "2", "check", "specs/tlv.rflx"]) == 0
+    assert cli.main(["rflx", "--workers", "1", "check", "specs/tlv.rflx"]) == 0
+
+
+def test_main_check_workers_restored() -> None:
+    assert cli.main(["rflx", "-j", "3", "check", "specs/tlv.rflx"]) == 0
+    assert expression.PROOF_WORKERS == 1
+    assert parser.PARSER_WORKERS == 1
+    assert not expression.PROOF_EXECUTORS
+
+
+def test_main_check_invalid_workers() -> None:
+    assert 'error: invalid number of workers "0"' in str(
+        cli.main(["rflx", "-j", "0", "check", "specs/tlv.rflx"])
+    )
+
+
+def test_main_check_proof_cache(tmp_path: Path) -> None:
+    try:
+        assert cli.main(["rflx", "--proof-cache", str(tmp_path), "check", "specs/tlv.rflx"]) == 0
+        assert list(tmp_path.glob("*/*.json"))
+        assert cli.main(["rflx", "--proof-cache", str(tmp_path), "check", "specs/tlv.rflx"]) == 0
+    finally:
+        set_proof_cache(None)
+
+
+def test_main_check_parser_cache(tmp_path: Path) -> None:
+    try:
+        assert cli.main(["rflx", "--parser-cache", str(tmp_path), "check", "specs/tlv.rflx"]) == 0
+        assert list(tmp_path.glob("*/*.pickle"))
+        assert cli.main(["rflx", "--parser-cache", str(tmp_path), "check", "specs/tlv.rflx"]) == 0
+    finally:
+        set_parser_cache(None)
+
+
 def test_main_check_parser_error() -> None:
     assert "parser error: " in str(cli.main(["rflx", "check", "README.md"]))
 
@@ -55,6 +93,28 @@ def test_main_generate(tmp_path: Path) -> None:
     assert top_level_package.exists()
 
 
+def test_main_generate_simplification_cache(tmp_path: Path) -> None:
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    assert cli.main(["rflx", "generate", "-d", str(tmp_path / "a"), "specs/tlv.rflx"]) == 0
+    assert (
+        cli.main(
+            [
+                "rflx",
+                "generate",
+                "--simplification-cache",
+                "-d",
+                str(tmp_path / "b"),
+                "specs/tlv.rflx",
+            ]
+        )
+        == 0
+    )
+    assert expression.SIMPLIFICATION_CACHE is None
+    for f in (tmp_path / "a").iterdir():
+        assert f.read_text() == (tmp_path / "b" / f.name).read_text()
+
+
 def test_main_generate_no_library_files(tmp_path: Path) -> None:
     assert (
         cli.main(
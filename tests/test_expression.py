@@ -1,5 +1,8 @@
 # pylint: disable=too-many-lines
 
+from pathlib import Path
+from typing import Any, Iterator
+
 import pytest
 import z3
 
@@ -40,6 +43,8 @@ from rflx.expression import (
     OrElse,
     Pos,
     Pow,
+    Proof,
+    ProofResult,
     Range,
     Result,
     Size,
@@ -48,6 +53,10 @@ from rflx.expression import (
     Val,
     ValueRange,
     Variable,
+    check_incrementally,
+    disable_simplification_cache,
+    enable_simplification_cache,
+    set_proof_cache,
 )
 from rflx.identifier import ID
 from tests.utils import assert_equal
@@ -1223,3 +1232,161 @@ def test_expr_str() -> None:
                        3))"""
         ),
     )
+
+
+def test_expr_hash() -> None:
+    assert hash(Variable("X")) == hash(Variable("X"))
+    assert hash(Length("X")) == hash(Length("X"))
+    assert hash(Add(Variable("X"), Number(1))) == hash(Add(Variable("X"), Number(1)))
+    assert len({Variable("X"), Variable("Y"), Length("X"), First("X"), Last("X")}) == 5
+
+
+def test_expr_hash_of_modified_copy() -> None:
+    x = Variable("X")
+    assert hash(-x) != hash(x)
+    assert hash(-(-x)) == hash(x)
+
+
+def test_expr_interned() -> None:
+    x = Add(Variable("X"), Number(1)).interned()
+    assert Add(Variable("X"), Number(1)).interned() is x
+    assert Add(Variable("Y"), Number(1)).interned() is not x
+
+
+def test_simplification_cache() -> None:
+    cache = enable_simplification_cache(2)
+    try:
+        expr = Add(Variable("X"), Number(1), Number(2))
+        assert expr.simplified() == Add(Variable("X"), Number(3))
+        assert cache.hits == 0
+        assert expr.simplified() == Add(Variable("X"), Number(3))
+        assert cache.hits == 1
+        assert Less(Number(1), Number(2)).simplified() == TRUE
+        assert Less(Number(2), Number(1)).simplified() == FALSE
+        assert len(cache) == 2
+        assert expr.simplified() == Add(Variable("X"), Number(3))
+        assert cache.hits == 1
+        assert cache.misses == 6
+    finally:
+        disable_simplification_cache()
+
+
+def test_simplification_cache_distinguishes_types() -> None:
+    enable_simplification_cache()
+    try:
+        assert And(Variable("X"), TRUE).simplified() == Variable("X")
+        assert isinstance(AndThen(Variable("X"), Variable("Y")).simplified(), AndThen)
+        assert isinstance(And(Variable("X"), Variable("Y")).simplified(), And)
+    finally:
+        disable_simplification_cache()
+
+
+def test_simplification_cache_distinguishes_bases() -> None:
+    enable_simplification_cache()
+    try:
+        assert str(Equal(Variable("X"), Number(16)).simplified()) == "X = 16"
+        assert str(Equal(Variable("X"), Number(16, 16)).simplified()) == "X = 16#10#"
+        assert str(Less(Variable("X"), Number(16, 16)).simplified()) == "X < 16#10#"
+        assert str(Less(Variable("X"), Number(16)).simplified()) == "X < 16"
+    finally:
+        disable_simplification_cache()
+
+
+def test_proof_cache(tmp_path: Path, monkeypatch: Any) -> None:
+    facts = [Equal(Variable("X"), Number(1)), Greater(Variable("Y"), Number(0))]
+    set_proof_cache(tmp_path)
+    try:
+        assert Proof(Equal(Variable("X"), Number(2)), facts).result == ProofResult.unsat
+        assert Proof(Equal(Variable("X"), Number(1)), facts).result == ProofResult.sat
+        error = Proof(Equal(Variable("X"), Number(2)), facts).error
+        assert error in ["X = 1\n   ∧ X = 2", "X = 2\n   ∧ X = 1"]
+        assert len(list(tmp_path.glob("*/*.json"))) == 2
+
+        monkeypatch.setattr(z3, "Solver", None)
+        assert Proof(Equal(Variable("X"), Number(2)), facts).result == ProofResult.unsat
+        assert Proof(Equal(Variable("X"), Number(1)), facts).result == ProofResult.sat
+        assert Proof(Equal(Variable("X"), Number(2)), facts).error == error
+    finally:
+        set_proof_cache(None)
+
+
+def test_proof_key() -> None:
+    assert Proof(Equal(Variable("X"), Number(2)), [Less(Variable("X"), Number(1))]).key == (
+        Proof(Equal(Variable("X"), Number(2)), [Less(Variable("X"), Number(1))]).key
+    )
+    assert Proof(Equal(Variable("X"), Number(2)), [Less(Variable("X"), Number(1))]).key != (
+        Proof(Equal(Variable("X"), Number(2)), [Less(Variable("X"), Number(2))]).key
+    )
+
+
+def test_check_incrementally() -> None:
+    x_1 = Equal(Variable("X"), Number(1))
+    y_positive = Greater(Variable("Y"), Number(0))
+    proofs = [
+        Proof(Equal(Variable("X"), Number(2)), [x_1, y_positive]),
+        Proof(Equal(Variable("X"), Number(1)), [x_1, y_positive]),
+        Proof(Less(Variable("Y"), Number(1)), [x_1, y_positive]),
+        Proof(Less(Variable("Y"), Number(1)), [x_1]),
+        Proof(Equal(Variable("X"), Number(2)), [y_positive, x_1]),
+        Proof(Less(Variable("Y"), Number(1)), []),
+    ]
+    assert check_incrementally(proofs) == [
+        ProofResult.unsat,
+        ProofResult.sat,
+        ProofResult.unsat,
+        ProofResult.sat,
+        ProofResult.unsat,
+        ProofResult.sat,
+    ]
+    assert check_incrementally(proofs) == [p.result for p in proofs]
+    assert check_incrementally([]) == []
+
+
+def test_check_until_sat() -> None:
+    x_1 = Equal(Variable("X"), Number(1))
+    consumed = []
+
+    def proofs() -> Iterator[Proof]:
+        for value in [2, 1, 3, 1]:
+            consumed.append(value)
+            yield Proof(Equal(Variable("X"), Number(value)), [x_1])
+
+    assert [p.result for p in Proof.check_until_sat(proofs(), workers=1)] == [
+        ProofResult.unsat,
+        ProofResult.sat,
+    ]
+    assert consumed == [2, 1]
+    consumed.clear()
+    assert [p.result for p in Proof.check_until_sat(proofs(), 3)] == [
+        ProofResult.unsat,
+        ProofResult.sat,
+    ]
+    assert consumed == [2, 1, 3]
+    assert Proof.check_until_sat([]) == []
+
+
+def test_check_until_sat_single_solver(monkeypatch: Any) -> None:
+    solvers = []
+
+    class Solver(z3.Solver):
+        def __init__(self) -> None:
+            super().__init__()
+            solvers.append(self)
+
+    monkeypatch.setattr(z3, "Solver", Solver)
+    x_1 = Equal(Variable("X"), Number(1))
+    y_1 = Equal(Variable("Y"), Number(1))
+    proofs = [
+        Proof(Equal(Variable("X"), Number(2)), [x_1]),
+        Proof(Equal(Variable("Y"), Number(2)), [x_1, y_1]),
+        Proof(Equal(Variable("X"), Number(3)), [x_1, Equal(Variable("Y"), Number(2))]),
+        Proof(Equal(Variable("X"), Number(1)), []),
+        Proof(Equal(Variable("Y"), Number(1)), [x_1, y_1]),
+    ]
+    assert [p.result for p in Proof.check_until_sat(proofs, workers=1)] == [
+        ProofResult.unsat,
+        ProofResult.unsat,
+        ProofResult.unsat,
+        ProofResult.sat,
+    ]
+    assert len(solvers) == 1
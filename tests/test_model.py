@@ -1,7 +1,9 @@
 from copy import deepcopy
+from typing import Any, Sequence
 
 import pytest
 
+from rflx import model
 from rflx.expression import (
     TRUE,
     Add,
@@ -17,6 +19,7 @@ from rflx.expression import (
     Number,
     Or,
     Pow,
+    Proof,
     Sub,
     Variable,
 )
@@ -405,10 +408,10 @@ def test_message_field_condition() -> None:
 
 
 def test_message_incoming() -> None:
-    assert_equal(ETHERNET_FRAME.incoming(INITIAL), [])
+    assert_equal(ETHERNET_FRAME.incoming(INITIAL), ())
     assert_equal(
         ETHERNET_FRAME.incoming(Field("Type_Length")),
-        [
+        (
             Link(
                 Field("Type_Length_TPID"),
                 Field("Type_Length"),
@@ -416,11 +419,11 @@ def test_message_incoming() -> None:
                 first=First("Type_Length_TPID"),
             ),
             Link(Field("TCI"), Field("Type_Length")),
-        ],
+        ),
     )
     assert_equal(
         ETHERNET_FRAME.incoming(FINAL),
-        [
+        (
             Link(
                 Field("Payload"),
                 FINAL,
@@ -428,15 +431,26 @@ def test_message_incoming() -> None:
                     GreaterEqual(Div(Length("Payload"), Number(8)), Number(46)),
                     LessEqual(Div(Length("Payload"), Number(8)), Number(1500)),
                 ),
-            )
-        ],
+            ),
+        ),
     )
 
 
 def test_message_outgoing() -> None:
-    assert_equal(ETHERNET_FRAME.outgoing(INITIAL), [Link(INITIAL, Field("Destination"))])
-    assert_equal(ETHERNET_FRAME.outgoing(Field("Type_Length")), ETHERNET_FRAME.structure[7:9])
-    assert_equal(ETHERNET_FRAME.outgoing(FINAL), [])
+    assert_equal(ETHERNET_FRAME.outgoing(INITIAL), (Link(INITIAL, Field("Destination")),))
+    assert_equal(
+        ETHERNET_FRAME.outgoing(Field("Type_Length")), tuple(ETHERNET_FRAME.structure[7:9])
+    )
+    assert_equal(ETHERNET_FRAME.outgoing(FINAL), ())
+
+
+def test_message_field_position() -> None:
+    assert ETHERNET_FRAME.field_position(INITIAL) == 0
+    assert ETHERNET_FRAME.field_position(Field("Destination")) == 1
+    assert ETHERNET_FRAME.field_position(Field("Payload")) == 7
+    assert ETHERNET_FRAME.field_position(FINAL) == 8
+    with pytest.raises(ValueError, match='^field "X" not found$'):
+        ETHERNET_FRAME.field_position(Field("X"))
 
 
 def test_message_direct_predecessors() -> None:
@@ -471,6 +485,56 @@ def test_message_definite_predecessors() -> None:
     )
 
 
+def test_message_definite_predecessors_many_optional_fields() -> None:
+    structure = []
+    for i in range(64):
+        structure.extend(
+            [
+                Link(Field(f"F{i}"), Field(f"O{i}")),
+                Link(Field(f"O{i}"), Field(f"F{i + 1}")),
+                Link(Field(f"F{i}"), Field(f"F{i + 1}")),
+            ]
+        )
+    message = UnprovenMessage(
+        "P.M",
+        [Link(INITIAL, Field("F0")), *structure, Link(Field("F64"), FINAL)],
+        {
+            **{Field(f"F{i}"): MODULAR_INTEGER for i in range(65)},
+            **{Field(f"O{i}"): MODULAR_INTEGER for i in range(64)},
+        },
+    )
+    assert message.definite_fields == tuple(Field(f"F{i}") for i in range(65))
+    assert message.definite_predecessors(Field("O1")) == (Field("F0"), Field("F1"))
+    assert len(next(message.paths(FINAL))) == 130
+
+
+def test_message_proofs_checked_in_batches(monkeypatch: Any) -> None:
+    sizes = []
+    check_all = Proof.check_all
+
+    def check_batch(proofs: Sequence[Proof], workers: int = None) -> None:
+        sizes.append(len(proofs))
+        check_all(proofs, workers)
+
+    monkeypatch.setattr(Proof, "check_all", staticmethod(check_batch))
+    monkeypatch.setattr(model, "PROOF_BATCH_SIZE", 2)
+    Message(ETHERNET_FRAME.identifier, ETHERNET_FRAME.structure, ETHERNET_FRAME.types)
+    assert len(sizes) > 10
+    assert max(sizes) <= 3
+
+
+def test_message_paths() -> None:
+    assert list(ETHERNET_FRAME.paths(INITIAL)) == [()]
+    assert list(ETHERNET_FRAME.paths(Field("Source"))) == [tuple(ETHERNET_FRAME.structure[:2])]
+    assert list(ETHERNET_FRAME.paths(Field("TCI"))) == [
+        (*ETHERNET_FRAME.structure[:4], ETHERNET_FRAME.structure[5])
+    ]
+    paths = list(ETHERNET_FRAME.paths(FINAL))
+    assert len(paths) == 4
+    assert len(set(paths)) == 4
+    assert all(p[0].source == INITIAL and p[-1].target == FINAL for p in paths)
+
+
 def test_message_predecessors() -> None:
     assert_equal(
         ETHERNET_FRAME.predecessors(FINAL),
@@ -1,10 +1,13 @@
 # pylint: disable=too-many-lines
 
+import re
+from functools import partial
 from itertools import zip_longest
 from pathlib import Path
 from typing import Any, Dict, Sequence
 
 import pytest
+from pyparsing import ParserElement
 
 from rflx.expression import (
     UNDEFINED,
@@ -39,7 +42,7 @@ from rflx.model import (
     RangeInteger,
     Refinement,
 )
-from rflx.parser import grammar, parser
+from rflx.parser import grammar, parser, recursive_descent
 from rflx.parser.ast import (
     ContextSpec,
     DerivationSpec,
@@ -50,7 +53,8 @@ from rflx.parser.ast import (
     Specification,
     Then,
 )
-from rflx.parser.parser import Component, ParseFatalException, Parser, ParserError
+from rflx.parser.lexer import Token, tokenize
+from rflx.parser.parser import Component, ParseFatalException, Parser, ParserError, set_parser_cache
 from tests.models import ETHERNET_FRAME
 from tests.utils import assert_equal
 
@@ -58,6 +62,14 @@ TESTDIR = "tests"
 SPECDIR = "specs"
 
 
+@pytest.fixture(autouse=True, params=[False, True], ids=["pyparsing", "recursive_descent"])
+def use_recursive_descent(request: Any, monkeypatch: Any) -> bool:
+    monkeypatch.setattr(
+        f"{__name__}.Parser", partial(parser.Parser, recursive_descent=request.param)
+    )
+    return request.param
+
+
 def assert_specifications_files(
     filenames: Sequence[str], specifications: Dict[str, Specification]
 ) -> None:
@@ -130,6 +142,48 @@ def raise_parser_error() -> None:
     raise ParserError("TEST")
 
 
+def test_unit() -> None:
+    assert grammar.unit() is grammar.unit()
+    assert grammar.unit().parseString("package Foo is end Foo;")[0].package.identifier == "Foo"
+
+
+def test_parser_enables_packrat() -> None:
+    Parser()
+    assert ParserElement._packratEnabled  # pylint: disable=protected-access
+
+
+def test_tokenize() -> None:
+    assert tokenize('type T is mod 16#FF#; -- comment\n  X\'First >= "A"') == [
+        Token("word", "type", 0, 4),
+        Token("word", "T", 5, 6),
+        Token("word", "is", 7, 9),
+        Token("word", "mod", 10, 13),
+        Token("based", "16#FF#", 14, 20),
+        Token("symbol", ";", 20, 21),
+        Token("word", "X", 35, 36),
+        Token("symbol", "'", 36, 37),
+        Token("word", "First", 37, 42),
+        Token("symbol", ">=", 43, 45),
+        Token("string", '"A"', 46, 49),
+        Token("end", "", 49, 49),
+    ]
+    assert tokenize("1 $") == [
+        Token("number", "1", 0, 1),
+        Token("error", "$", 2, 3),
+        Token("end", "", 3, 3),
+    ]
+
+
+def test_recursive_descent_expressions() -> None:
+    for string in [
+        "package Test is type M is message A : T then B with Length => 2**8 - 1 * 2 ** (1 + X'Length)"
+        " / 16#FF#; B : T; end message; end Test;",
+        'package Test is for P use (F => S) if A = "A" & (1, 2) and B < C or (D /= E); end Test;',
+        "package Test is for P use (F => S) if (1) = ((2)) and ((3) & (4)) = (5 + 6); end Test;",
+    ]:
+        assert recursive_descent.parse(string) == list(grammar.unit().parseString(string))
+
+
 def test_unexpected_exception_in_grammar(monkeypatch: Any) -> None:
     with pytest.raises(ParseFatalException, match=r"implementation error \(division by zero\)"):
         monkeypatch.setattr(
@@ -269,6 +323,51 @@ def test_comment_only_message() -> None:
     assert_messages_files([f"{TESTDIR}/comment_only.rflx"], [])
 
 
+@pytest.mark.parametrize(
+    "string,location",
+    [
+        (
+            """package Test is
+   type T is mod 256;
+   type M is
+      message
+         F : T
+            then G--
+ if F = 1;
+         G : T;
+      end message;
+end Test;
+""",
+            r"\(line:6, col:21\)",
+        ),
+        (
+            """package Test is
+   type T is (HEARTBE--AT_RESPONSE => 1) with Size => 8;
+end Test;
+""",
+            r"\(line:2, col:57\)",
+        ),
+        ("with I--Pv4;\npackage Test is\nend Test;\n", r"\(line:1, col:13\)"),
+        (
+            """package Test is
+   type T is (Bar --=> 1) with Size => 8;
+end Test;
+""",
+            r"\(line:2, col:42\)",
+        ),
+    ],
+)
+def test_comment_after_identifier(string: str, location: str) -> None:
+    assert_parse_exception_string(string, location)
+
+
+def test_comment_after_identifier_ending_with_word_character() -> None:
+    assert_specifications_string(
+        "with I--Pv4\n;\npackage Test is\nend Test--1\n;\n",
+        {"Test": Specification(ContextSpec(["I"]), PackageSpec("Test", []))},
+    )
+
+
 def test_incorrect_name() -> None:
     assert_parser_error(
         [f"{TESTDIR}/incorrect_name.rflx"],
@@ -339,6 +438,109 @@ def test_context_dependency_cycle() -> None:
     )
 
 
+def test_context_dependency_self_cycle(tmp_path: Path) -> None:
+    (tmp_path / "a.rflx").write_text("with A;\npackage A is\nend A;\n")
+    assert_parser_error(
+        [str(tmp_path / "a.rflx")], r'^dependency cycle due to context item "A" in "A"$'
+    )
+
+
+def test_parse_string_order() -> None:
+    p = Parser()
+    p.parse_string("package A is\n   type T is mod 256;\nend A;\n")
+    p.parse_string(
+        "package B is\n   type M is\n      message\n         F : A.T;\n      end message;\nend B;\n"
+    )
+    assert list(p.specifications) == ["A", "B"]
+    assert [str(m.identifier) for m in p.create_model().messages] == ["B.M"]
+
+
+def test_context_dependency_diamond(tmp_path: Path, caplog: Any) -> None:
+    (tmp_path / "a.rflx").write_text("with B;\nwith C;\npackage A is\nend A;\n")
+    (tmp_path / "b.rflx").write_text("with D;\npackage B is\nend B;\n")
+    (tmp_path / "c.rflx").write_text("with D;\nwith E;\npackage C is\nend C;\n")
+    (tmp_path / "d.rflx").write_text(
+        "with E;\npackage D is\n"
+        "   type M is\n      message\n         F : E.T;\n      end message;\nend D;\n"
+    )
+    (tmp_path / "e.rflx").write_text("package E is\n   type T is mod 256;\nend E;\n")
+    caplog.set_level("INFO")
+    p = Parser()
+    p.parse(tmp_path / "a.rflx")
+    p.parse(tmp_path / "d.rflx")
+    assert sorted(r.getMessage() for r in caplog.records if r.name == "rflx.parser.parser") == [
+        f"Parsing {tmp_path / name}.rflx" for name in "abcde"
+    ]
+    assert list(p.specifications) == ["E", "D", "B", "C", "A"]
+    assert [str(m.identifier) for m in p.create_model().messages] == ["D.M"]
+
+
+def test_parse_all() -> None:
+    specfiles = [Path(f"{SPECDIR}/{name}.rflx") for name in ["in_ipv4", "in_ethernet", "tlv"]]
+    sequential = Parser()
+    for specfile in specfiles:
+        sequential.parse(specfile)
+    parallel = Parser()
+    parallel.parse_all(specfiles, workers=2)
+    assert list(parallel.specifications.items()) == list(sequential.specifications.items())
+
+
+def test_parse_all_single_pool(tmp_path: Path, monkeypatch: Any) -> None:
+    executors = []
+
+    class Executor(parser.ProcessPoolExecutor):
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            super().__init__(*args, **kwargs)
+            executors.append(self)
+
+    monkeypatch.setattr(parser, "ProcessPoolExecutor", Executor)
+    (tmp_path / "a.rflx").write_text("with B;\nwith C;\npackage A is\nend A;\n")
+    (tmp_path / "b.rflx").write_text("with D;\nwith E;\npackage B is\nend B;\n")
+    (tmp_path / "c.rflx").write_text("package C is\nend C;\n")
+    (tmp_path / "d.rflx").write_text("package D is\nend D;\n")
+    (tmp_path / "e.rflx").write_text("package E is\nend E;\n")
+    (tmp_path / "f.rflx").write_text("package F is\nend F;\n")
+    p = Parser()
+    p.parse_all([tmp_path / "a.rflx", tmp_path / "f.rflx"], workers=2)
+    assert list(p.specifications) == ["D", "E", "B", "C", "A", "F"]
+    assert len(executors) == 1
+
+
+def test_parse_all_error(tmp_path: Path) -> None:
+    (tmp_path / "a.rflx").write_text("with B;\nwith C;\npackage A is\nend A;\n")
+    (tmp_path / "b.rflx").write_text("package B is\n   type T is mod;\nend B;\n")
+    (tmp_path / "c.rflx").write_text("package C is\nend C;\n")
+    with pytest.raises(ParserError, match=r"^\n   type T is mod;\n(?s:.*)\(line:2, col:17\)$"):
+        Parser().parse_all([tmp_path / "c.rflx", tmp_path / "a.rflx"], workers=2)
+
+
+def test_parser_cache(tmp_path: Path, monkeypatch: Any) -> None:
+    specfile = tmp_path / "test.rflx"
+    specfile.write_text("package Test is\n   type T is mod 256;\nend Test;\n")
+    cache = tmp_path / "cache"
+    set_parser_cache(cache)
+    try:
+        p = Parser()
+        p.parse(specfile)
+        specifications = p.specifications
+        assert len(list(cache.glob("*/*.pickle"))) == 1
+
+        with monkeypatch.context() as m:
+            m.setattr(grammar, "unit", None)
+            m.setattr(recursive_descent, "parse", None)
+            p = Parser()
+            p.parse(specfile)
+            assert p.specifications == specifications
+
+        specfile.write_text("package Test is\n   type T is mod 2**16;\nend Test;\n")
+        p = Parser()
+        p.parse(specfile)
+        assert p.specifications != specifications
+        assert len(list(cache.glob("*/*.pickle"))) == 2
+    finally:
+        set_parser_cache(None)
+
+
 def test_duplicate_type() -> None:
     assert_parser_error_string(
         """
@@ -381,7 +583,13 @@ def test_message_undefined_component() -> None:
     )
 
 
-def test_invalid_location_expression() -> None:
+def test_invalid_location_expression(use_recursive_descent: bool) -> None:
+    expected = re.escape(
+        '"First" or "Length"'
+        if use_recursive_descent
+        else '{{"First" - "=>" - MathematicalExpression} | {"Length" - "=>" -'
+        " MathematicalExpression}}"
+    )
     assert_parse_exception_string(
         """
             package Test is
@@ -395,8 +603,7 @@ def test_invalid_location_expression() -> None:
                   end message;
             end Test;
         """,
-        r'^Expected {{"First" - "=>" - MathematicalExpression} | {"Length" - "=>" -'
-        r" MathematicalExpression}} \(at char 239\), \(line:8, col:38\)$",
+        rf"^Expected {expected}, found 'F'  \(at char 211\), \(line:8, col:34\)$",
     )
 
 
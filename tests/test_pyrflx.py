@@ -1,22 +1,48 @@
 # pylint: disable=too-many-lines
 
+import gc
 import itertools
+import mmap
+import operator
+import pickle
+import struct
+import weakref
+from copy import copy
 from pathlib import Path
-from typing import List
+from typing import Any, List
 
 import pytest
 
-from rflx.expression import UNDEFINED
+from rflx.expression import (
+    TRUE,
+    UNDEFINED,
+    Aggregate,
+    And,
+    Div,
+    Equal,
+    Expr,
+    First,
+    Greater,
+    Last,
+    Length,
+    Less,
+    Mul,
+    Or,
+    Sub,
+    Variable,
+)
 from rflx.identifier import ID
 from rflx.model import (
     FINAL,
     INITIAL,
     Array,
     Enumeration,
+    Field,
     ModularInteger,
     Number,
     Opaque,
     RangeInteger,
+    Refinement,
     Type,
 )
 from rflx.pyrflx import (
@@ -31,6 +57,15 @@ from rflx.pyrflx import (
     PyRFLX,
     TypeValue,
 )
+from rflx.pyrflx.bitstring import write_bits
+from rflx.pyrflx.decoder import (
+    Decoder,
+    LiteralTable,
+    RefinementTable,
+    Undecidable,
+    compile_expression,
+    literal_comparison,
+)
 
 TESTDIR = "tests"
 SPECDIR = "specs"
@@ -187,6 +222,36 @@ def test_package_iterator(tlv_package: Package) -> None:
     assert [m.name for m in tlv_package] == ["Message"]
 
 
+def test_package_getitem(tlv_package: Package) -> None:
+    message = tlv_package["Message"]
+    message.set("Tag", "Msg_Data")
+    message.set("Length", 1)
+    message.set("Value", b"\x01")
+    assert message.valid_message
+
+    fresh = MessageValue(message._type)
+    for m in [tlv_package["Message"], copy(message)]:
+        assert m == fresh
+        assert m.accessible_fields == fresh.accessible_fields == ["Tag"]
+        m.set("Tag", "Msg_Error")
+        assert m.valid_message
+        assert message.get("Tag") == "Msg_Data"
+
+
+def test_message_slots(tlv_checksum: MessageValue) -> None:
+    tlv_checksum.set("Tag", "Msg_Data")
+    tlv_checksum.set("Length", 1)
+    tlv_checksum.set("Value", b"\x01")
+    field = tlv_checksum._fields["Value"]
+    for obj in [tlv_checksum, field, field.typeval, tlv_checksum._fields["Length"].typeval]:
+        assert not hasattr(obj, "__dict__")
+    assert "_refinements=" in repr(tlv_checksum)
+    assert "typeval=" in repr(field)
+    value = copy(field.typeval)
+    assert value == field.typeval
+    assert value is not field.typeval
+
+
 def test_message_identifier(frame: MessageValue) -> None:
     assert frame.identifier == ID("Ethernet.Frame")
     assert frame.package == ID("Ethernet")
@@ -285,6 +350,24 @@ def test_valid_fields(tlv_checksum: MessageValue) -> None:
     assert tlv_checksum.valid_fields == ["Tag", "Length", "Value", "Checksum"]
 
 
+def test_valid_fields_changed(tlv_checksum: MessageValue) -> None:
+    other = copy(tlv_checksum)
+    tlv_checksum.set("Tag", "Msg_Data")
+    tlv_checksum.set("Length", 1)
+    tlv_checksum.valid_fields.clear()
+    assert tlv_checksum.valid_fields == ["Tag", "Length"]
+    assert tlv_checksum.required_fields == ["Value", "Checksum"]
+    tlv_checksum.set("Length", 2)
+    tlv_checksum.set("Value", b"\x01\x02")
+    assert tlv_checksum.valid_fields == ["Tag", "Length", "Value"]
+    tlv_checksum.set("Tag", "Msg_Error")
+    assert tlv_checksum.valid_fields == ["Tag"]
+    assert tlv_checksum.required_fields == []
+    assert tlv_checksum.valid_message
+    assert other.valid_fields == []
+    assert other.accessible_fields == copy(tlv_checksum).accessible_fields == ["Tag"]
+
+
 def test_set_value(tlv_checksum: MessageValue) -> None:
     v1 = b"\x01\x02\x03\x04\x05\x06\x07\x08"
     v2 = b"\x01\x02\x03\x04\x05\x06\x07\x08\x09\x10"
@@ -703,6 +786,22 @@ def test_value_equal() -> None:
     assert mv != rv
 
 
+def test_opaque_value_equal(tlv: MessageValue) -> None:
+    # pylint: disable=protected-access
+    first = OpaqueValue(Opaque())
+    second = OpaqueValue(Opaque())
+    first.assign(b"\x01")
+    second.assign(b"\x01")
+    second._initial_messages[0, 0] = (None, tlv)
+    assert first == second
+    first.set_expected_size(Number(8))
+    assert first != second
+    second.set_expected_size(Number(8))
+    assert first == second
+    first.set_refinement(tlv._type, [])
+    assert first != second
+
+
 def test_value_clear() -> None:
     ov = OpaqueValue(Opaque())
     assert not ov.initialized
@@ -815,6 +914,44 @@ def test_bitstring(tlv_checksum: MessageValue) -> None:
     assert not tlv_checksum.valid_message
 
 
+def test_bitstring_slicing() -> None:
+    bits = Bitstring.from_bytes(b"\x0f\xa5\x3c")
+    assert str(bits) == "000011111010010100111100"
+    assert str(bits[4:12]) == "11111010"
+    assert int(bits[4:12]) == 0xFA
+    assert bytes(bits[4:12]) == b"\xfa"
+    assert bytes(bits[8:]) == b"\xa5\x3c"
+    assert str(bits[4:12][2:5]) == "111"
+    assert str(bits[3]) == "0"
+    assert str(bits[-1]) == "0"
+    assert str(bits[::8]) == "010"
+    assert len(bits[20:]) == 4
+    assert bits[4:12] == Bitstring("11111010")
+    assert bits[4:12] + bits[0:4] == Bitstring("111110100000")
+    assert bits[8:16] + bits[16:24] == Bitstring.from_bytes(b"\xa5\x3c")
+    assert Bitstring.join([bits[0:4], bits[4:8], bits[8:]]) == bits
+    assert Bitstring.from_int(5, 4) == Bitstring("0101")
+    assert bytes(Bitstring("0100")) == b"\x04"
+    with pytest.raises(IndexError):
+        bits[20:25]  # pylint: disable=pointless-statement
+    with pytest.raises(IndexError):
+        bits[24]  # pylint: disable=pointless-statement
+
+
+def test_write_bits() -> None:
+    buffer = bytearray(3)
+    write_bits(buffer, 0, 8, b"\xff")
+    assert buffer == b"\xff\x00\x00"
+    write_bits(buffer, 4, 8, 0x5A)
+    assert buffer == b"\xf5\xa0\x00"
+    write_bits(buffer, 12, 12, b"\x0f\xff")
+    assert buffer == b"\xf5\xaf\xff"
+    write_bits(buffer, 1, 2, 0)
+    assert buffer == b"\x95\xaf\xff"
+    write_bits(buffer, 8, 16, 0x1234)
+    assert buffer == b"\x95\x12\x34"
+
+
 def test_odd_length_binary(message_odd_length: MessageValue) -> None:
     test_bytes = b"\x01\x02\x01\xff\xb8"
     message_odd_length.parse(test_bytes)
@@ -869,6 +1006,105 @@ def test_array_parse_from_bytes(array_message: MessageValue, array_type_foo: Mes
     assert array_type_foo.bytestring == b"\x03\x05\x06\x07"
 
 
+def test_array_parse_scalars() -> None:
+    # pylint: disable=protected-access
+    modular = ArrayValue(Array("Test.Array", ModularInteger("Test.Mod_Int", Number(2 ** 16))))
+    modular.parse(b"\x01\x02\x03\x04")
+    assert modular._packed is not None
+    assert modular.bitstring == Bitstring.from_bytes(b"\x01\x02\x03\x04")
+    assert [v.value for v in modular.value] == [0x0102, 0x0304]
+    assert modular._packed is None
+    assert modular.bitstring == Bitstring.from_bytes(b"\x01\x02\x03\x04")
+
+    range_integer = ArrayValue(
+        Array("Test.Array", RangeInteger("Test.Range_Int", Number(1), Number(10), Number(4)))
+    )
+    range_integer.parse(Bitstring("00010010"))
+    assert [v.value for v in range_integer.value] == [1, 2]
+    with pytest.raises(ValueError, match=r"^value 11 not in type range 1 .. 10$"):
+        range_integer.parse(Bitstring("00011011"))
+
+    literals = {"One": Number(1), "Two": Number(2)}
+    enum = ArrayValue(Array("Test.Array", Enumeration("Test.Enum", literals, Number(2), False)))
+    enum.parse(Bitstring("011001"))
+    assert [v.value for v in enum.value] == ["One", "Two", "One"]
+    with pytest.raises(KeyError, match=r"^'Number 3 is not a valid enum value'$"):
+        enum.parse(Bitstring("0111"))
+
+    enum = ArrayValue(Array("Test.Array", Enumeration("Test.Enum", literals, Number(2), True)))
+    enum.parse(Bitstring("0111"))
+    assert [v.value for v in enum.value] == ["One", "UNKNOWN"]
+
+
+def test_lazy_parsing(
+    frame: MessageValue, array_message: MessageValue, array_type_foo: MessageValue
+) -> None:
+    # pylint: disable=protected-access
+    data = Path(f"{TESTDIR}/ethernet_ipv4_udp.raw").read_bytes()
+    eager = copy(frame)
+    eager.parse(data)
+    frame.parse(data, lazy=True)
+    payload = frame._fields["Payload"].typeval
+    assert isinstance(payload, OpaqueValue)
+    assert payload._nested_message is None
+    assert frame.valid_message
+    assert frame.bytestring == data
+    assert frame.get("Payload") == eager.get("Payload")
+    assert frame.get("Payload") is frame.get("Payload")
+    assert frame == eager
+
+    array_message.parse(b"\x02\x05\x06", lazy=True)
+    bar = array_message._fields["Bar"].typeval
+    assert isinstance(bar, ArrayValue)
+    assert bar._pending is not None
+    assert array_message.valid_message
+    assert array_message.bytestring == b"\x02\x05\x06"
+    assert [m.get("Byte") for m in array_message.get("Bar")] == [5, 6]  # type: ignore
+    assert bar._pending is None
+
+    array_type_foo.parse(b"\x03\x05\x06\x07", lazy=True)
+    array = array_type_foo.get("Bytes")
+    assert isinstance(array, list)
+    assert [v.value for v in array] == [5, 6, 7]
+
+
+def test_nested_message_initial_messages(pyrflx: PyRFLX) -> None:
+    # pylint: disable=protected-access
+    data = Path(f"{TESTDIR}/ethernet_ipv4_udp.raw").read_bytes()
+    first = pyrflx["Ethernet"]["Frame"]
+    second = pyrflx["Ethernet"]["Frame"]
+    first.parse(data)
+    second.parse(data)
+    first_payload = first._fields["Payload"].typeval
+    second_payload = second._fields["Payload"].typeval
+    assert isinstance(first_payload, OpaqueValue) and isinstance(second_payload, OpaqueValue)
+    assert first_payload._initial_messages is second_payload._initial_messages
+    assert len(first_payload._initial_messages) == 1
+    assert first_payload._nested_message is not second_payload._nested_message
+    assert first_payload._nested_message == second_payload._nested_message
+    assert pickle.loads(pickle.dumps(first_payload))._initial_messages == {}
+
+
+def test_opaque_parse_without_copy(frame: MessageValue) -> None:
+    # pylint: disable=protected-access
+    data = Path(f"{TESTDIR}/ethernet_ipv4_udp.raw").read_bytes()
+    frame.parse(data)
+    payload = frame._fields["Payload"].typeval
+    assert isinstance(payload, OpaqueValue)
+    assert isinstance(payload._value, memoryview)
+    assert payload._value.obj is data
+    assert frame.bytestring is data
+    assert pickle.loads(pickle.dumps(frame)) == frame
+
+    frame.set("Destination", 0)
+    assert frame.bytestring == b"\x00" * 6 + data[6:]
+
+    value = bytearray(data[14:])
+    frame.set("Payload", bytes(value))
+    value[0] = 0
+    assert frame.bytestring == b"\x00" * 6 + data[6:]
+
+
 def test_array_assign_incorrect_values(
     tlv: MessageValue, frame: MessageValue, array_type_foo: MessageValue
 ) -> None:
@@ -1129,6 +1365,32 @@ def test_ipv4_parsing_udp_in_ipv4(ipv4: MessageValue) -> None:
     assert nested_udp.valid_message
 
 
+def test_ipv4_serialization_unchanged_by_set(ipv4: MessageValue) -> None:
+    with open("tests/ipv4_udp.raw", "rb") as file:
+        msg_as_bytes: bytes = file.read()
+    ipv4.parse(msg_as_bytes[:6] + b"\x13\x00" + msg_as_bytes[8:])
+    assert ipv4.get("Fragment_Offset") != 0
+    serialized = ipv4.bytestring
+    payload = ipv4.get("Payload")
+    assert isinstance(payload, MessageValue)
+    ttl = ipv4.get("TTL")
+    assert isinstance(ttl, int)
+    ipv4.set("TTL", ttl)
+    ipv4.set("Payload", payload.bytestring)
+    assert ipv4.valid_message
+    assert ipv4.bytestring == serialized
+
+
+def test_ipv4_in_ethernet_serialization(frame: MessageValue) -> None:
+    with open("tests/ethernet_ipv4_udp.raw", "rb") as file:
+        msg_as_bytes: bytes = file.read()
+    frame.parse(msg_as_bytes[:20] + b"\x13\x00" + msg_as_bytes[22:])
+    ipv4 = frame.get("Payload")
+    assert isinstance(ipv4, MessageValue)
+    assert ipv4.get("Fragment_Offset") != 0
+    assert frame.bytestring[14:] == ipv4.bytestring
+
+
 def test_ipv4_parsing_udp_in_ipv4_in_ethernet(frame: MessageValue) -> None:
     with open("tests/ethernet_ipv4_udp.raw", "rb") as file:
         msg_as_bytes: bytes = file.read()
@@ -1324,3 +1586,287 @@ def test_tlv_generating_tlv_error(tlv: MessageValue) -> None:
     tlv.set("Tag", "Msg_Error")
     assert tlv.valid_message
     assert tlv.bytestring == b"\xc0"
+
+
+def test_decoder_compile_expression() -> None:
+    literals = {"Msg_Data": 1}
+    values = {"Tag": 1, "Length": 4}
+    firsts = {"Tag": 0, "Length": 2}
+    lengths = {"Tag": 2, "Length": 14}
+
+    def evaluate(expr: Expr) -> Any:
+        return compile_expression(expr, literals)(values, firsts, lengths)
+
+    assert evaluate(Equal(Variable("Tag"), Variable("Msg_Data"))) is True
+    assert evaluate(Mul(Variable("Length"), Number(8))) == 32
+    assert evaluate(Sub(Last("Length"), First("Tag"))) == 15
+    assert evaluate(Div(Length("Length"), Number(2))) == 7
+    assert evaluate(And(Less(Variable("Length"), Number(4)), Variable("Value"))) is False
+    assert evaluate(Or(Greater(Variable("Length"), Number(3)), Variable("Value"))) is True
+    for expr in [
+        Variable("Value"),
+        Length("Message"),
+        Div(Length("Length"), Number(3)),
+        And(Variable("Value"), TRUE),
+        Equal(Variable("Value"), Aggregate(Number(1))),
+    ]:
+        with pytest.raises(Undecidable):
+            evaluate(expr)
+
+
+def test_decoder_refinement_table(
+    tlv: MessageValue, frame: MessageValue, ipv4: MessageValue, udp: MessageValue
+) -> None:
+    # pylint: disable=protected-access
+    literals = {"Msg_Data": 1, "Msg_Error": 3}
+    conditions: List[Expr] = [
+        Equal(Variable("Tag"), Variable("Msg_Data")),
+        Greater(Variable("Length"), Number(4)),
+        Equal(Number(8), Variable("Length")),
+    ]
+    table = RefinementTable(
+        [
+            Refinement("In_TLV", tlv._type, Field("Value"), sdu._type, condition)
+            for sdu, condition in zip([frame, ipv4, udp], conditions)
+        ],
+        literals,
+    )
+
+    assert [literal_comparison(c, literals) for c in conditions] == [
+        ("Tag", 1),
+        None,
+        ("Length", 8),
+    ]
+    assert literal_comparison(Equal(Variable("Tag"), Variable("Length")), literals) is None
+    assert table.select({"Tag": 1, "Length": 2}, {}, {}) == frame._type
+    assert table.select({"Tag": 1, "Length": 5}, {}, {}) == ipv4._type
+    assert table.select({"Tag": 1, "Length": 8}, {}, {}) == udp._type
+    assert table.select({"Tag": 3, "Length": 2}, {}, {}) is None
+    assert table.select({}, {}, {}) is None
+
+
+def test_pyrflx_released() -> None:
+    def load() -> List["weakref.ref[Any]"]:
+        pyrflx = PyRFLX([f"{SPECDIR}/tlv.rflx"])
+        message = pyrflx["TLV"]["Message"]
+        message.parse(b"\x40\x00\x04\x01\x02\x03\x04")
+        assert message.get("Tag") == "Msg_Data"
+        tag = message._type.types[Field("Tag")]
+        return [weakref.ref(x) for x in [pyrflx, message._type, tag]]
+
+    references = load()
+    gc.collect()
+    assert all(r() is None for r in references)
+
+
+def test_decoder_literal_table() -> None:
+    enum = Enumeration("P.E", {"One": Number(1), "Two": Number(2)}, Number(8), False)
+    enum_always_valid = Enumeration("P.F", {"One": Number(1)}, Number(8), True)
+    table = LiteralTable(enum)
+
+    assert table.by_name("Two") == ("Two", Number(2))
+    assert table.by_value(1) == ("One", Number(1))
+    assert LiteralTable(enum_always_valid).by_value(3) == ("UNKNOWN", Number(3))
+    with pytest.raises(KeyError, match=r"^'Three is not a valid enum value'$"):
+        table.by_name("Three")
+    with pytest.raises(KeyError, match=r"^'Number 3 is not a valid enum value'$"):
+        table.by_value(3)
+
+    first = EnumValue(enum)
+    second = copy(first)
+    first.parse(b"\x02")
+    second.assign("Two")
+    assert first.value == second.value == "Two"
+    assert first._value is second._value  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize(
+    "package,message,raw",
+    [
+        ("Ethernet", "Frame", "ethernet_802.3.raw"),
+        ("Ethernet", "Frame", "ethernet_double_vlan_tag.raw"),
+        ("Ethernet", "Frame", "ethernet_ipv4_udp.raw"),
+        ("Ethernet", "Frame", "ethernet_vlan_tag.raw"),
+        ("IPv4", "Packet", "ipv4_udp.raw"),
+    ],
+)
+def test_decoder(pyrflx: PyRFLX, package: str, message: str, raw: str) -> None:
+    data = Path(f"{TESTDIR}/{raw}").read_bytes()
+    decoded = pyrflx[package][message]
+    parsed = pyrflx[package][message]
+
+    assert Decoder(decoded._type, decoded._refinements).decode(Bitstring.from_bytes(data))
+
+    decoded.parse(data)
+    parsed._MessageValue__parse_fields(Bitstring.from_bytes(data))  # type: ignore
+
+    assert decoded._MessageValue__plan is pyrflx[package][message]._MessageValue__plan  # type: ignore
+
+    assert decoded == parsed
+    assert decoded.accessible_fields == parsed.accessible_fields
+    assert decoded.valid_fields == parsed.valid_fields
+    assert decoded.valid_message
+    assert decoded.bytestring == parsed.bytestring == data
+
+
+def test_decoded_payload_size_not_fixed(frame: MessageValue) -> None:
+    frame.parse(Path(f"{TESTDIR}/ethernet_double_vlan_tag.raw").read_bytes())
+    frame.set("Payload", bytes(50))
+    assert frame.valid_message
+    assert frame.get("Payload") == bytes(50)
+
+
+def test_serialize_many(pyrflx: PyRFLX) -> None:
+    messages = []
+    for raw in ["ethernet_802.3.raw", "ethernet_ipv4_udp.raw", "ethernet_vlan_tag.raw"]:
+        frame = pyrflx["Ethernet"]["Frame"]
+        frame.parse(Path(f"{TESTDIR}/{raw}").read_bytes())
+        messages.append(frame)
+    tlv = pyrflx["TLV"]["Message"]
+    tlv.set("Tag", "Msg_Error")
+    messages.append(tlv)
+
+    assert MessageValue.serialize_many(messages) == [m.bytestring for m in messages]
+    assert MessageValue.serialize_many([]) == []
+
+
+def write_pcap(path: Path, packets: List[bytes]) -> None:
+    with open(path, "wb") as f:
+        f.write(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1))
+        for p in packets:
+            f.write(struct.pack("<IIII", 0, 0, len(p), len(p)))
+            f.write(p)
+
+
+def test_package_parse(pyrflx: PyRFLX) -> None:
+    packets = [
+        Path(f"{TESTDIR}/{raw}").read_bytes()
+        for raw in [
+            "ethernet_ipv4_udp.raw",
+            "ethernet_invalid_too_short.raw",
+            "ethernet_802.3.raw",
+            "ethernet_undefined.raw",
+            "ethernet_vlan_tag.raw",
+        ]
+    ]
+    valid = [packets[0], packets[2], packets[4]]
+
+    assert [
+        m.bytestring for m in pyrflx["Ethernet"].parse("Frame", packets, skip_invalid=True)
+    ] == valid
+    assert [
+        m.valid_message for m in pyrflx["Ethernet"].parse("Frame", packets, skip_invalid=True)
+    ] == [True, True, True]
+
+    with pytest.raises(ValueError, match=r"^none of the field conditions .* for field Payload"):
+        list(pyrflx["Ethernet"].parse("Frame", packets))
+
+
+def test_package_parse_capture(pyrflx: PyRFLX, tmp_path: Path) -> None:
+    packets = [
+        Path(f"{TESTDIR}/{raw}").read_bytes()
+        for raw in ["ethernet_ipv4_udp.raw", "ethernet_802.3.raw", "ethernet_vlan_tag.raw"]
+    ]
+    write_pcap(tmp_path / "test.pcap", packets)
+
+    with open(tmp_path / "test.pcap", "rb") as f:
+        assert [m.bytestring for m in pyrflx["Ethernet"].parse_capture("Frame", f)] == packets
+
+    with open(tmp_path / "test.pcap", "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as capture:
+            assert [
+                m.bytestring for m in pyrflx["Ethernet"].parse_capture("Frame", capture)
+            ] == packets
+
+    assert [
+        m.bytestring
+        for m in pyrflx["Ethernet"].parse_capture("Frame", (tmp_path / "test.pcap").read_bytes())
+    ] == packets
+
+    with pytest.raises(ValueError, match=r"^unsupported capture format \(pcap expected\)$"):
+        list(pyrflx["Ethernet"].parse_capture("Frame", packets[0]))
+
+    with pytest.raises(ValueError, match=r"^truncated pcap record$"):
+        list(pyrflx["Ethernet"].parse_capture("Frame", (tmp_path / "test.pcap").read_bytes()[:-1]))
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_parse_parallel(processes: int) -> None:
+    pyrflx = PyRFLX([f"{SPECDIR}/ethernet.rflx"])
+    packets = [
+        Path(f"{TESTDIR}/{raw}").read_bytes()
+        for raw in [
+            "ethernet_ipv4_udp.raw",
+            "ethernet_invalid_too_short.raw",
+            "ethernet_802.3.raw",
+            "ethernet_vlan_tag.raw",
+        ]
+    ] * 5
+    valid = [p for i, p in enumerate(packets) if i % 4 != 1]
+    bytestring = operator.attrgetter("bytestring")
+
+    assert (
+        list(
+            pyrflx.parse_parallel(
+                "Ethernet",
+                "Frame",
+                packets,
+                bytestring,
+                processes=processes,
+                skip_invalid=True,
+                chunksize=3,
+            )
+        )
+        == valid
+    )
+    assert sorted(
+        pyrflx.parse_parallel(
+            "Ethernet",
+            "Frame",
+            packets,
+            bytestring,
+            processes=processes,
+            ordered=False,
+            skip_invalid=True,
+        )
+    ) == sorted(valid)
+
+    with pytest.raises(ValueError, match=r"^none of the field conditions .* for field Payload"):
+        list(pyrflx.parse_parallel("Ethernet", "Frame", packets, bytestring, processes=processes))
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_parse_capture_parallel(processes: int, tmp_path: Path) -> None:
+    pyrflx = PyRFLX([f"{SPECDIR}/ethernet.rflx"])
+    packets = [
+        Path(f"{TESTDIR}/{raw}").read_bytes()
+        for raw in ["ethernet_ipv4_udp.raw", "ethernet_802.3.raw", "ethernet_vlan_tag.raw"]
+    ] * 5
+    write_pcap(tmp_path / "test.pcap", packets)
+    bytestring = operator.attrgetter("bytestring")
+
+    assert (
+        list(
+            pyrflx.parse_capture_parallel(
+                "Ethernet",
+                "Frame",
+                tmp_path / "test.pcap",
+                bytestring,
+                processes=processes,
+                chunksize=4,
+            )
+        )
+        == packets
+    )
+    assert (
+        list(
+            pyrflx.parse_capture_parallel(
+                "Ethernet",
+                "Frame",
+                (tmp_path / "test.pcap").read_bytes(),
+                bytestring,
+                processes=processes,
+            )
+        )
+        == packets
+    )
@@ -18,6 +18,7 @@ from rflx.expression import (
     Number,
     Sub,
     Variable,
+    set_proof_workers,
 )
 from rflx.model import (
     FINAL,
@@ -159,7 +160,7 @@ def test_invalid_path_1(monkeypatch: Any) -> None:
     types = {
         Field("F1"): RANGE_INTEGER,
     }
-    monkeypatch.setattr(Message, "_AbstractMessage__prove_reachability", lambda x: None)
+    monkeypatch.setattr(Message, "_AbstractMessage__prove_reachability", lambda x: [])
     assert_message_model_error(
         structure,
         types,
@@ -177,7 +178,7 @@ def test_invalid_path_2(monkeypatch: Any) -> None:
         Field("F1"): RANGE_INTEGER,
         Field("F2"): RANGE_INTEGER,
     }
-    monkeypatch.setattr(Message, "_AbstractMessage__prove_reachability", lambda x: None)
+    monkeypatch.setattr(Message, "_AbstractMessage__prove_reachability", lambda x: [])
     assert_message_model_error(
         structure,
         types,
@@ -204,6 +205,29 @@ def test_contradiction() -> None:
     )
 
 
+def test_contradiction_parallel() -> None:
+    structure = [
+        Link(INITIAL, Field("F1")),
+        Link(Field("F1"), Field("F2"), condition=Less(Variable("F1"), Number(50))),
+        Link(Field("F1"), Field("F2"), condition=Equal(Number(1), Number(2))),
+        Link(Field("F1"), FINAL, condition=Greater(Variable("F1"), Number(60))),
+        Link(Field("F2"), FINAL),
+    ]
+    types = {
+        Field("F1"): RANGE_INTEGER,
+        Field("F2"): RANGE_INTEGER,
+    }
+    set_proof_workers(2)
+    try:
+        assert_message_model_error(
+            structure,
+            types,
+            r'^contradicting condition 1 from field "F1" to "F2" on path \[F1\] in "P.M"',
+        )
+    finally:
+        set_proof_workers(1)
+
+
 def test_invalid_type_condition_range_low() -> None:
     structure = [
         Link(INITIAL, Field("F1")),
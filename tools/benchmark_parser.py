@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from rflx.parser import Parser
+
+
+def main(argv: List[str]) -> Optional[str]:
+    parser = argparse.ArgumentParser(
+        description="Print the time needed for parsing each of the specification files."
+    )
+    parser.add_argument("-n", type=int, default=3, help="number of measurements per file")
+    parser.add_argument(
+        "--recursive-descent", action="store_true", help="use the recursive descent parser"
+    )
+    parser.add_argument(
+        "files", metavar="FILE", type=str, nargs="*", help="specification file", default=[]
+    )
+    args = parser.parse_args(argv[1:])
+
+    files = [Path(f) for f in args.files] or sorted(Path("specs").glob("*.rflx"))
+
+    print(f"{'File':<40} {'Time [ms]':>10}")
+    total = 0.0
+    for f in files:
+        duration = measure(f, args.n, args.recursive_descent)
+        total += duration
+        print(f"{str(f):<40} {duration * 1000:>10.1f}")
+    print(f"{'Total':<40} {total * 1000:>10.1f}")
+
+    return None
+
+
+def measure(specfile: Path, count: int, recursive_descent: bool) -> float:
+    """Return the mean time in seconds for parsing a specification file and its dependencies."""
+    start = time.perf_counter()
+    for _ in range(count):
+        Parser(recursive_descent).parse(specfile)
+    return (time.perf_counter() - start) / count
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
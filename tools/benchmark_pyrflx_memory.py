@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from rflx.pyrflx import MessageValue, PyRFLX
+
+SAMPLES = {
+    ("Ethernet", "Frame"): "tests/ethernet_ipv4_udp.raw",
+    ("IPv4", "Packet"): "tests/ipv4_udp.raw",
+}
+
+
+def main(argv: List[str]) -> Optional[str]:
+    parser = argparse.ArgumentParser(
+        description="Print the memory used per message for all messages in the specifications."
+    )
+    parser.add_argument("-n", type=int, default=100, help="number of messages per measurement")
+    parser.add_argument(
+        "files", metavar="FILE", type=str, nargs="*", help="specification file", default=[]
+    )
+    args = parser.parse_args(argv[1:])
+
+    pyrflx = PyRFLX(args.files or [str(f) for f in sorted(Path("specs").glob("*.rflx"))])
+
+    print(f"{'Message':<40} {'Initial':>10} {'Parsed':>10}")
+    for package in sorted(pyrflx, key=lambda p: p.name):
+        for message in sorted(package, key=lambda m: m.name):
+            key = (package.name, message.name)
+            initial = measure(lambda: package[message.name], args.n)
+            parsed = (
+                f"{measure(parse(package[message.name], Path(SAMPLES[key])), args.n):>10}"
+                if key in SAMPLES
+                else f"{'-':>10}"
+            )
+            print(f"{'.'.join(key):<40} {initial:>10} {parsed}")
+
+    return None
+
+
+def parse(template: MessageValue, sample: Path) -> Callable[[], MessageValue]:
+    data = sample.read_bytes()
+
+    def parse_sample() -> MessageValue:
+        message = template.__copy__()
+        message.parse(data)
+        return message
+
+    return parse_sample
+
+
+def measure(create: Callable[[], object], count: int) -> int:
+    """Return the number of bytes allocated per object, which is kept alive."""
+    create()
+    tracemalloc.start()
+    objects = [create() for _ in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size // count
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))